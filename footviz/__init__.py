@@ -0,0 +1,7 @@
+"""
+Shared helpers for the match visualizations in this repo.
+
+Every report folder keeps its own script, parameters and data; the code that
+is the same for all of them (loading events, counting passes, colormaps...)
+lives here.
+"""
@@ -0,0 +1,116 @@
+"""
+Images placed on the figure (team logos, social media icons).
+
+Images are decoded once per process and kept in memory, keyed on their
+content, so copies of the same file in different folders share one entry.
+When a figure is saved each image is drawn from a copy resized to the
+pixels it covers at the output DPI, also cached: matplotlib then doesn't
+resample the full resolution file on every render, and a batch of
+figures of the same size resizes each image once.
+"""
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from matplotlib.image import AxesImage
+from matplotlib.patches import Rectangle
+from PIL import Image
+
+# Social media icons of the credits
+ICONS_DIR = Path(__file__).resolve().parent / 'icons'
+
+# Resized copies kept (a few images, in a few sizes)
+CACHE_SIZE = 64
+
+_decoded = {}
+_resized = OrderedDict()
+
+
+def load_image(path):
+    """
+    The image at `path` as a read-only RGBA uint8 array, and its key.
+    Files are read every time (to hash them) but decoded only once.
+    """
+    data = Path(path).read_bytes()
+    key = hashlib.sha1(data).hexdigest()
+    if key not in _decoded:
+        with Image.open(Path(path)) as image:
+            array = np.asarray(image.convert('RGBA'))
+        array.flags.writeable = False
+        _decoded[key] = array
+    return _decoded[key], key
+
+
+def resized_image(key, size):
+    """Decoded image `key` resized to `size` (width, height) pixels."""
+    cache_key = (key, size)
+    if cache_key not in _resized:
+        image = Image.fromarray(_decoded[key])
+        # Resample with premultiplied alpha so edges don't darken
+        image = image.convert('RGBa').resize(size, Image.LANCZOS)
+        array = np.asarray(image.convert('RGBA'))
+        array.flags.writeable = False
+        _resized[cache_key] = array
+    _resized.move_to_end(cache_key)
+    while len(_resized) > CACHE_SIZE:
+        _resized.popitem(last=False)
+    return _resized[cache_key]
+
+
+class CachedImage(AxesImage):
+    """
+    AxesImage that draws from a cached copy of the image resized to the
+    size of its axes at the current DPI (never larger than the original).
+    The extent stays in pixels of the original, like imshow sets it.
+    """
+
+    def __init__(self, ax, key, **kwargs):
+        super().__init__(ax, **kwargs)
+        self._key = key
+        self._full = _decoded[key]
+        self.set_data(self._full)
+
+    def draw(self, renderer):
+        h, w = self._full.shape[:2]
+        bbox = self.axes.bbox
+        scale = min(bbox.width / w, bbox.height / h)
+        if scale < 1:
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            data = resized_image(self._key, size)
+        else:
+            data = self._full
+        if data is not self._A:
+            self.set_data(data)
+        super().draw(renderer)
+
+
+def add_image(fig, rect, path, preview=False, **kwargs):
+    """
+    New axes at `rect` (figure fraction) showing the image at `path`.
+
+    With preview=True the image is not decoded: a grey box of the same
+    size and aspect takes its place, so the layout doesn't change.
+    """
+    newax = fig.add_axes(rect, **kwargs)
+    if preview:
+        # Only reads the header
+        with Image.open(path) as image:
+            w, h = image.size
+    else:
+        array, key = load_image(path)
+        h, w = array.shape[:2]
+
+    # Same limits and aspect as imshow would set
+    newax.set_xlim(-0.5, w - 0.5)
+    newax.set_ylim(h - 0.5, -0.5)
+    newax.set_aspect('equal')
+    if preview:
+        newax.add_patch(Rectangle((-0.5, -0.5), w, h, facecolor='0.85',
+                                  edgecolor='none'))
+    else:
+        image = CachedImage(newax, key, extent=(-0.5, w - 0.5, h - 0.5, -0.5))
+        image.set_clip_path(newax.patch)
+        newax.add_image(image)
+    newax.axis('off')
+    return newax
@@ -0,0 +1,177 @@
+"""
+Build the pass network of every match in a folder, one worker process per
+match/team.
+
+    python -m footviz.batch data/round_12 rosters.json -o out/round_12
+
+rosters.json maps every match file (name without .csv) to its teams, and
+every team to its raw -> display player names, in the order the player
+heatmaps are drawn. Title, subtitle and logo are optional:
+
+    {
+        "20240119_events": {
+            "Home": {
+                "title": "DT Jonathan Mendoza - La Concordia SC",
+                "subtitle": "Victoria 4-1 vs. Japan Auto",
+                "logo": "data/20240119_logo.png",
+                "players": {"1": "1 Albarracin", "54 Hurt": "54 Hurtado"}
+            }
+        }
+    }
+
+For each match and team it writes <match>_<team>_network.png, the full
+pass count matrix as <match>_<team>_adjacency.csv and the player metrics
+(footviz.metrics) as <match>_<team>_metrics.csv.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+from footviz import instrument
+from footviz.assets import ICONS_DIR
+from footviz.events import load_events, team_rows
+from footviz.metrics import network_metrics
+from footviz.network import build_network, sort_for_pairing
+from footviz.roster import Roster
+
+
+def make_jobs(events_dir, rosters, out_dir, **options):
+    events_dir = Path(events_dir)
+    files = {f.stem: f for f in sorted(events_dir.glob('*.csv'))}
+
+    jobs = []
+    for match, teams in rosters.items():
+        if match not in files:
+            print(f'{match}: no {match}.csv in {events_dir}, skipped')
+            continue
+        for team, roster in teams.items():
+            jobs.append({
+                'path': files[match],
+                'match': match,
+                'team': team,
+                'roster': roster,
+                'out_dir': Path(out_dir),
+                **options,
+            })
+
+    for match in files.keys() - rosters.keys():
+        print(f'{match}: no roster, skipped')
+    return jobs
+
+
+def run_job(job):
+    """Build, draw and save one team's pass network. Runs in a worker."""
+    # Stages of every job are reported under its name
+    with instrument.stage(f"job.{job['match']}.{job['team']}"):
+        return _run_job(job)
+
+
+def _run_job(job):
+    import matplotlib.pyplot as plt
+    from footviz.network_plot import plot_pass_network, save
+
+    df = load_events(job['path'],
+                     half_time=job['half_time'],
+                     invert_first_half=job['invert_first_half'])
+    df = team_rows(df, job['team'])
+
+    roster = job['roster']
+    players = Roster(roster['players'])
+    player_list = players.players
+
+    df = sort_for_pairing(df)
+    for message in players.check(df).messages():
+        print(f"{job['match']} {job['team']}: {message}")
+    df = players.apply(df)
+    net = build_network(df)
+
+    name = f"{job['match']}_{job['team']}".replace(' ', '_')
+    out_dir = job['out_dir']
+    net['passes'].to_csv(out_dir / f'{name}_adjacency.csv')
+    network_metrics(net['passes']).to_csv(out_dir / f'{name}_metrics.csv')
+
+    fig = plot_pass_network(df, net, player_list,
+                            title_text=roster.get('title', job['team']),
+                            subtitle_text=roster.get('subtitle', ''),
+                            logo=roster.get('logo'),
+                            icons_dir=job['icons_dir'])
+    png = out_dir / f'{name}_network.png'
+    save(fig, png, dpi=job['dpi'])
+    plt.close(fig)
+
+    return png, net['misordered']
+
+
+def run_batch(events_dir, rosters, out_dir, workers=None, half_time=60,
+              invert_first_half=False, icons_dir=ICONS_DIR, dpi=250):
+    """Returns the list of (job, error) that failed."""
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    jobs = make_jobs(events_dir, rosters, out_dir,
+                     half_time=half_time,
+                     invert_first_half=invert_first_half,
+                     icons_dir=icons_dir,
+                     dpi=dpi)
+
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            label = f"{job['match']} {job['team']}"
+            try:
+                png, misordered = future.result()
+            except Exception as e:
+                print(f'{label}: FAILED ({e!r})')
+                failed.append((job, e))
+                continue
+            if misordered:
+                print(f'{label}: {misordered} PASSES RECEIVED NOT IN ORDER')
+            print(f'{label}: {png}')
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('events_dir', help='folder with <match>.csv files')
+    parser.add_argument('rosters', help='JSON file with match -> team -> '
+                                        'roster mapping')
+    parser.add_argument('-o', '--out-dir', default='out')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--half-time', type=int, default=60)
+    parser.add_argument('--invert-first-half', action='store_true')
+    icons = parser.add_mutually_exclusive_group()
+    icons.add_argument('--icons-dir', default=ICONS_DIR,
+                       help='folder with tw.png/ig.png for the credits '
+                            '(default footviz/icons)')
+    icons.add_argument('--no-icons', dest='icons_dir', action='store_const',
+                       const=None, help='credits without the icons')
+    parser.add_argument('--dpi', type=int, default=250)
+    parser.add_argument('--profile', metavar='PATH', default=None,
+                        help='append per-stage timings (JSON lines) to PATH, '
+                             'see footviz.instrument')
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        instrument.enable(args.profile)
+
+    with open(args.rosters, encoding='utf-8') as f:
+        rosters = json.load(f)
+
+    failed = run_batch(args.events_dir, rosters, args.out_dir,
+                       workers=args.workers,
+                       half_time=args.half_time,
+                       invert_first_half=args.invert_first_half,
+                       icons_dir=args.icons_dir,
+                       dpi=args.dpi)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
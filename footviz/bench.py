@@ -0,0 +1,193 @@
+"""
+Time every stage of both reports on synthetic data of growing size.
+
+    python -m footviz.bench -o bench.json
+    python -m footviz.bench --scales 1 10 --dpi 100 -o quick.json
+
+For each scale (times the rows of the real match, see footviz.synthetic)
+the events file is generated once, then each report is run stage by stage:
+
+    load       pd.read_csv of the raw file
+    clean      footviz.events.clean_events (sort, types, half time flip,
+               StatsBomb coordinates)
+    aggregate  pass network: sort_for_pairing + build_network
+               team profile: EventIndex (panels slice it while drawing)
+    render     drawing the figure and saving the PNG
+
+Results are written as JSON, one record per script, scale and stage,
+rewritten after every stage so an interrupted run keeps what it timed. A
+stage that takes longer than --max-seconds is not run at larger scales
+(recorded with "skipped": true), so one slow render doesn't stall the run;
+the stages after it need its output, so they are skipped with it.
+"""
+import argparse
+import io
+import json
+import platform
+import tempfile
+import time
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from footviz.events import clean_events
+from footviz.index import EventIndex
+from footviz.network import build_network, rename_players, sort_for_pairing
+from footviz.synthetic import generate
+
+SCALES = [1, 10, 100, 1000]
+STAGES = ['load', 'clean', 'aggregate', 'render']
+
+
+def pass_network_stages(info, dpi):
+    from footviz.network_plot import plot_pass_network, save
+
+    # Eleven most frequent passers, as the roster
+    players = info['players'][:11]
+    state = {}
+
+    def load():
+        state['raw'] = pd.read_csv(info['path'])
+
+    def clean():
+        state['df'] = clean_events(state['raw'], info['half_time'])
+
+    def aggregate():
+        df = sort_for_pairing(state['df'])
+        state['df'] = rename_players(df, players, players)
+        state['net'] = build_network(state['df'])
+
+    def render():
+        fig = plot_pass_network(state['df'], state['net'], players,
+                                title_text='Benchmark', icons_dir=None)
+        save(fig, io.BytesIO(), dpi=dpi)
+        plt.close(fig)
+
+    return dict(zip(STAGES, [load, clean, aggregate, render]))
+
+
+def team_profile_stages(info, dpi):
+    from footviz.shotmap_plot import plot_team_profile, save
+
+    defenders = info['players'][:3]
+    state = {}
+
+    def load():
+        state['raw'] = pd.read_csv(info['path'])
+
+    def clean():
+        state['df'] = clean_events(state['raw'], info['half_time'])
+
+    def aggregate():
+        state['idx'] = EventIndex(state['df'])
+
+    def render():
+        fig = plot_team_profile(state['idx'], defenders,
+                                title_text='Benchmark', icons_dir=None)
+        save(fig, io.BytesIO(), dpi=dpi)
+        plt.close(fig)
+
+    return dict(zip(STAGES, [load, clean, aggregate, render]))
+
+
+SCRIPTS = {
+    'pass_network': pass_network_stages,
+    'shotmap': team_profile_stages,
+}
+
+
+def run(scales=SCALES, scripts=SCRIPTS, work_dir=None, dpi=250,
+        max_seconds=600.0, seed=0, on_record=None):
+    """
+    Run the benchmark and return the list of records. on_record(records)
+    is called after every stage, with the records so far.
+    """
+    work_dir = Path(work_dir or tempfile.mkdtemp(prefix='footviz-bench-'))
+    records = []
+    too_slow = set()
+
+    for scale in scales:
+        start = time.perf_counter()
+        info = generate(work_dir / f'events_x{scale}.csv', scale, seed=seed)
+        print(f'x{scale}: {info["rows"]} rows generated in '
+              f'{time.perf_counter() - start:.1f}s')
+
+        for script in scripts:
+            stages = SCRIPTS[script](info, dpi)
+            skipping = False
+            for stage, func in stages.items():
+                record = {'script': script, 'scale': scale,
+                          'rows': info['rows'], 'stage': stage}
+                # Later stages read what a skipped one would have made
+                skipping = skipping or (script, stage) in too_slow
+                if skipping:
+                    records.append({**record, 'seconds': None,
+                                    'skipped': True})
+                else:
+                    start = time.perf_counter()
+                    func()
+                    seconds = time.perf_counter() - start
+                    records.append({**record, 'seconds': seconds,
+                                    'skipped': False})
+                    print(f'  {script:<13} {stage:<10} {seconds:9.3f}s')
+
+                    if seconds > max_seconds:
+                        too_slow.add((script, stage))
+                if on_record:
+                    on_record(records)
+    return records
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Time load/clean/aggregate/render on synthetic data.')
+    parser.add_argument('-o', '--out', default='bench.json',
+                        help='JSON results (default bench.json)')
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES,
+                        help='sizes, in real matches (default 1 10 100 1000)')
+    parser.add_argument('--scripts', nargs='+', choices=list(SCRIPTS),
+                        default=list(SCRIPTS))
+    parser.add_argument('--work-dir', default=None,
+                        help='where the synthetic files are written')
+    parser.add_argument('--dpi', type=int, default=250)
+    parser.add_argument('--max-seconds', type=float, default=600.0,
+                        help='skip a stage at larger scales once it takes '
+                             'longer than this (default 600)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = environment()
+
+    def write(records):
+        results = {
+            'environment': env,
+            'options': {'dpi': args.dpi, 'max_seconds': args.max_seconds,
+                        'seed': args.seed},
+            'results': records,
+        }
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    write(run(args.scales, args.scripts, args.work_dir, args.dpi,
+              args.max_seconds, args.seed, on_record=write))
+    print(f'Results written to {args.out}')
+
+
+if __name__ == '__main__':
+    main()
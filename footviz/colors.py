@@ -0,0 +1,76 @@
+"""
+Colormaps made from a team's base colour:
+
+    light tint -> tint -> base colour -> dark shade
+
+custom_cmap(colour) is cached (LRU on colour and parameters), and
+custom_cmaps(colours) builds the palettes of many colours in one go with
+array math, for league-wide reports with one colour per team.
+"""
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.colors import (LinearSegmentedColormap, hsv_to_rgb,
+                               rgb_to_hsv, to_hex, to_rgb)
+
+CACHE_SIZE = 256
+
+_cache = OrderedDict()
+
+
+def palettes(colors, sat_diff1=0.2, sat_diff2=0.25, bright_diff=0.6):
+    """
+    The four colours of every base colour, as an (n, 4, 3) RGB array in
+    0-1, rounded to 8 bits like the hex colours they replace.
+    """
+    rgb = np.array([to_rgb(c) for c in colors], dtype=float).reshape(-1, 3)
+    # Same 8 bit values as parsing the hex colour
+    rgb = np.round(rgb * 255) / 255
+    hsv = rgb_to_hsv(rgb)
+    h, s, v = hsv[:, 0], hsv[:, 1], hsv[:, 2]
+
+    stops = np.stack([
+        np.stack([h, s * sat_diff1, np.ones_like(v)], axis=-1),
+        np.stack([h, s * sat_diff2, np.ones_like(v)], axis=-1),
+        hsv,
+        np.stack([h, s, v * bright_diff], axis=-1),
+    ], axis=1)
+    return np.round(hsv_to_rgb(stops) * 255) / 255
+
+
+def _key(color, params):
+    return (to_hex(color), *params)
+
+
+def custom_cmaps(colors, sat_diff1=0.2, sat_diff2=0.25, bright_diff=0.6):
+    """
+    One colormap per colour, in order. Colours not cached yet are built
+    together. The colormaps are shared: copy() one before changing it.
+    """
+    params = (sat_diff1, sat_diff2, bright_diff)
+    keys = [_key(c, params) for c in colors]
+
+    missing = list(dict.fromkeys(k for k in keys if k not in _cache))
+    if missing:
+        built = palettes([k[0] for k in missing], *params)
+        for key, palette in zip(missing, built):
+            _cache[key] = LinearSegmentedColormap.from_list('custom', palette)
+
+    cmaps = []
+    for key in keys:
+        _cache.move_to_end(key)
+        cmaps.append(_cache[key])
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return cmaps
+
+
+def custom_cmap(clr, sat_diff1=0.2, sat_diff2=0.25, bright_diff=0.6):
+    """Colormap from `clr` (any matplotlib colour), cached."""
+    return custom_cmaps([clr], sat_diff1, sat_diff2, bright_diff)[0]
+
+
+def color_list(clr, sat_diff1=0.2, sat_diff2=0.25, bright_diff=0.6):
+    """The four colours of custom_cmap(clr) as hex strings."""
+    palette = palettes([clr], sat_diff1, sat_diff2, bright_diff)[0]
+    return [to_hex(c) for c in palette]
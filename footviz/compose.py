@@ -0,0 +1,136 @@
+"""
+Draw the panels of a report in parallel and composite them.
+
+A report is a figure with its frame already drawn (titles, logos, credits)
+plus a list of Panels: an empty axes of that figure and the function that
+fills it. With render_parallel every panel is drawn by a worker process on
+its own transparent canvas, at the same size, DPI and crop as the final
+image, and the main process alpha-blends the results onto the frame. The
+report then takes about as long as its slowest panel.
+"""
+import io
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.transforms import TransformedBbox
+from PIL import Image
+
+from footviz.instrument import stage
+from footviz.pitches import set_axes
+
+# func(ax, *args) draws the panel (pitch included) on ax
+Panel = namedtuple('Panel', ['ax', 'pitch', 'func', 'args'])
+
+
+def prepare_axes(pitch, ax):
+    """
+    Limits, aspect and hidden ticks of `pitch` without drawing it, so the
+    layout (and panel titles) match the drawn figure.
+    """
+    set_axes(pitch, ax)
+
+
+def draw_panels(panels):
+    """Draw the panels in this process, on the figure itself."""
+    for panel in panels:
+        with stage(f'panel.{panel.func.__name__}'):
+            panel.func(panel.ax, *panel.args)
+
+
+def _render_panel(job):
+    """Draw one panel on a transparent canvas. Runs in a worker."""
+    func, args, position, size, dpi = job
+
+    with stage(f'panel.{func.__name__}'):
+        fig = Figure(figsize=size, dpi=dpi)
+        FigureCanvasAgg(fig)
+        fig.patch.set_alpha(0)
+        ax = fig.add_axes(position)
+        func(ax, *args)
+
+        fig.canvas.draw()
+        rgba = np.asarray(fig.canvas.buffer_rgba())
+
+    # Only send back the part that was drawn on
+    rows = np.flatnonzero(rgba[:, :, 3].any(axis=1))
+    cols = np.flatnonzero(rgba[:, :, 3].any(axis=0))
+    if not len(rows):
+        return 0, 0, rgba[:0, :0].copy()
+    y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    return y0, x0, rgba[y0:y1, x0:x1].copy()
+
+
+def _blend(base, y0, x0, layer):
+    h = min(layer.shape[0], base.shape[0] - y0)
+    w = min(layer.shape[1], base.shape[1] - x0)
+    if h <= 0 or w <= 0:
+        return
+    layer = layer[:h, :w].astype(np.float32) / 255
+    region = base[y0:y0 + h, x0:x0 + w]
+
+    alpha = layer[:, :, 3:]
+    out_alpha = alpha + region[:, :, 3:] * (1 - alpha)
+    rgb = layer[:, :, :3] * alpha + region[:, :, :3] * region[:, :, 3:] \
+        * (1 - alpha)
+    region[:, :, :3] = np.divide(rgb, out_alpha, out=np.zeros_like(rgb),
+                                 where=out_alpha > 0)
+    region[:, :, 3:] = out_alpha
+
+
+def render_parallel(fig, panels, dpi=250, workers=None, pad_inches=0.1):
+    """
+    Render `fig` with its `panels` drawn by worker processes and return the
+    composited image (PIL, RGBA), cropped like bbox_inches='tight'.
+    """
+    # Run the layout once with the frame and the empty panel axes, at the
+    # output DPI like savefig does, then freeze it so the workers can place
+    # their axes at the same spot
+    fig.set_dpi(dpi)
+    with stage('layout'):
+        fig.canvas.draw()
+    fig.set_layout_engine('none')
+    # Axes positions in inches (axes of subfigures are relative to them)
+    positions = [
+        TransformedBbox(p.ax.get_position(original=True),
+                        p.ax.figure.transSubfigure
+                        + fig.dpi_scale_trans.inverted()).frozen()
+        for p in panels
+    ]
+
+    renderer = fig.canvas.get_renderer()
+    bbox = fig.get_tightbbox(renderer).padded(pad_inches)
+
+    # Frame: everything but the panels, cropped to the final bbox
+    buf = io.BytesIO()
+    with stage('savefig'):
+        fig.savefig(buf, format='png', dpi=dpi, bbox_inches=bbox)
+    buf.seek(0)
+    base = np.asarray(Image.open(buf).convert('RGBA'), dtype=np.float32) / 255
+    base = base.copy()
+
+    # Panel positions on a canvas that is exactly the cropped figure
+    size = (base.shape[1] / dpi, base.shape[0] / dpi)
+    jobs = []
+    for panel, pos in zip(panels, positions):
+        left = (pos.x0 - bbox.x0) / size[0]
+        bottom = (pos.y0 - bbox.y0) / size[1]
+        width = pos.width / size[0]
+        height = pos.height / size[1]
+        jobs.append((panel.func, panel.args,
+                     (left, bottom, width, height), size, dpi))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for y0, x0, layer in pool.map(_render_panel, jobs):
+            with stage('composite'):
+                _blend(base, y0, x0, layer)
+
+    return Image.fromarray((base * 255 + 0.5).astype(np.uint8), 'RGBA')
+
+
+def save_parallel(fig, panels, path, dpi=250, workers=None):
+    image = render_parallel(fig, panels, dpi, workers)
+    image.save(path, dpi=(dpi, dpi))
+    return image
@@ -0,0 +1,265 @@
+"""
+Load and clean event data exported as
+Team,Player,Event,Mins,Secs,X,Y,X2,Y2
+
+The cleaned table is cached next to the source file, keyed on the file hash,
+so every script and every panel parses the same CSV only once.
+load_season reads a whole folder of matches concurrently into one table.
+
+Coordinates come in Opta units (0-100). Cleaning also stores them in
+StatsBomb units (120x80, the pitches the figures draw) as X_sb, Y_sb,
+X2_sb and Y2_sb, so plotting code never converts them again.
+"""
+import hashlib
+import io
+import os
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed)
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from footviz.instrument import stage, staged
+
+# Bump when the cleaning below changes so old caches are not reused
+CACHE_VERSION = 2
+
+COORDS = ['X', 'Y', 'X2', 'Y2']
+SB_COORDS = ['X_sb', 'Y_sb', 'X2_sb', 'Y2_sb']
+
+DTYPES = {
+    'Team': 'category',
+    'Player': 'category',
+    'Event': 'category',
+    'Mins': np.int16,
+    'Secs': np.int16,
+    'X': np.float32,
+    'Y': np.float32,
+}
+
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# Pitch markings (goal line, six yard box, penalty spot, box edge, halfway
+# line, ...) of both pitches, as mplsoccer's Standardizer matches them.
+# Points are interpolated linearly between corresponding markings.
+# StatsBomb y is measured from the other touchline.
+_OPTA_X = np.array([0, 5.8, 11.5, 17, 50, 83, 88.5, 94.2, 100])
+_SB_X = np.array([0, 6, 12, 18, 60, 102, 108, 114, 120], dtype=float)
+_OPTA_Y = np.array([0, 21.1, 36.8, 45.2, 54.8, 63.2, 78.9, 100])
+_SB_Y = np.array([0, 18, 30, 36, 44, 50, 62, 80], dtype=float)
+
+
+def _interpolate(v, markings_from, markings_to):
+    v = np.clip(v, markings_from[0], markings_from[-1])
+    pos = np.clip(np.searchsorted(markings_from, np.nan_to_num(v)),
+                  1, len(markings_from) - 1)
+    low_from, high_from = markings_from[pos - 1], markings_from[pos]
+    low_to, high_to = markings_to[pos - 1], markings_to[pos]
+    # NaN stays NaN
+    proportion = (v - low_from) / (high_from - low_from)
+    return low_to + (high_to - low_to) * proportion
+
+
+def to_statsbomb(x, y):
+    """
+    Opta coordinates (arrays, NaN allowed) to StatsBomb coordinates, the
+    same as mplsoccer's Standardizer without importing mplsoccer.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    return (_interpolate(x, _OPTA_X, _SB_X),
+            80 - _interpolate(y, _OPTA_Y, _SB_Y))
+
+
+@staged('clean')
+def clean_events(data: pd.DataFrame, half_time=60, invert_first_half=False):
+    # Sort values by time
+    with stage('sort_time'):
+        df = data.sort_values(['Mins', 'Secs'], kind='stable')
+
+    # Fix Missing Values ('-' on events without an end location)
+    for col in ['X2', 'Y2']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.astype({**DTYPES, 'X2': np.float32, 'Y2': np.float32})
+
+    with stage('coordinates'):
+        # Get 1st and 2nd Half values to invert coordinates
+        first = (df['Mins'] < half_time).to_numpy()
+        second = (df['Mins'] > half_time).to_numpy()
+        df = df[first | second].reset_index(drop=True)
+
+        # Invert coordinates
+        flip = first[first | second] if invert_first_half \
+            else second[first | second]
+        opta = df[COORDS].to_numpy()
+        opta[flip] = 100 - opta[flip]
+
+        # Start and end points converted in one call
+        x, y = to_statsbomb(opta[:, [0, 2]], opta[:, [1, 3]])
+        df[COORDS] = opta
+        df[SB_COORDS] = np.column_stack(
+            [x[:, 0], y[:, 0], x[:, 1], y[:, 1]]).astype(np.float32)
+
+    return df
+
+
+def _cache_file(path, digest, half_time, invert_first_half, cache_dir):
+    cache_dir = Path(cache_dir) if cache_dir else path.parent / '.cache'
+    key = f'{digest}-{half_time}-{int(invert_first_half)}-v{CACHE_VERSION}'
+    return cache_dir / f'{path.stem}-{key}.pkl'
+
+
+@contextmanager
+def atomic_write(path):
+    """
+    Temporary path (same folder and suffix) to write `path` through. It
+    replaces `path` when the block ends, so a parallel run or a viewer
+    never reads half a file, and is removed if the block fails.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.stem}.{os.getpid()}.tmp{path.suffix}')
+    try:
+        yield tmp
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _write_cache(df, cache_file):
+    with atomic_write(cache_file) as tmp:
+        df.to_pickle(tmp)
+
+
+def load_events(path, half_time=60, invert_first_half=False,
+                cache_dir=None, use_cache=True):
+    """
+    Read an events CSV and return it cleaned, with typed columns:
+    categorical Team/Player/Event, int16 Mins/Secs and float32 coordinates
+    (second half flipped so the team always attacks left to right), in
+    Opta and StatsBomb units.
+    """
+    path = Path(path)
+    if not use_cache:
+        with stage('read'):
+            data = pd.read_csv(path)
+        return clean_events(data, half_time, invert_first_half)
+
+    cache_file = _cache_file(path, file_hash(path), half_time,
+                             invert_first_half, cache_dir)
+    if cache_file.exists():
+        with stage('read_cache'):
+            return pd.read_pickle(cache_file)
+
+    with stage('read'):
+        data = pd.read_csv(path)
+    df = clean_events(data, half_time, invert_first_half)
+    _write_cache(df, cache_file)
+    return df
+
+
+def team_rows(df: pd.DataFrame, team):
+    """
+    Rows of `team` (every row for None). Player keeps only the players of
+    those rows as categories, so networks and metrics built from them
+    don't list the other team.
+    """
+    if team is not None:
+        df = df[df['Team'] == team].reset_index(drop=True)
+    df = df.copy()
+    df['Player'] = df['Player'].cat.remove_unused_categories()
+    return df
+
+
+def _read_file(path, half_time, invert_first_half, cache_dir, use_cache):
+    """Thread: the cleaned cache if there is one, else the raw bytes."""
+    data = path.read_bytes()
+    if not use_cache:
+        return data, None, None
+    digest = hashlib.sha1(data).hexdigest()
+    cache_file = _cache_file(path, digest, half_time, invert_first_half,
+                             cache_dir)
+    if cache_file.exists():
+        return None, pd.read_pickle(cache_file), cache_file
+    return data, None, cache_file
+
+
+def _parse_clean(data, half_time, invert_first_half):
+    """Worker process: parse and clean the bytes of one CSV."""
+    return clean_events(pd.read_csv(io.BytesIO(data)), half_time,
+                        invert_first_half)
+
+
+def _combine(tables, matches):
+    """One table with a categorical Match column; categories are merged."""
+    for col in ['Team', 'Player', 'Event']:
+        categories = union_categoricals(
+            [t[col] for t in tables], sort_categories=True).categories
+        for t in tables:
+            t[col] = t[col].cat.set_categories(categories)
+    for t, match in zip(tables, matches):
+        t['Match'] = match
+    df = pd.concat(tables, ignore_index=True)
+    df['Match'] = pd.Categorical(df['Match'], categories=matches)
+    return df
+
+
+@staged('load_season')
+def load_season(paths, half_time=60, invert_first_half=False, workers=None,
+                io_threads=8, cache_dir=None, use_cache=True):
+    """
+    Read and clean many event CSVs at once into one table (as
+    load_events), each row tagged with its Match (the file name without
+    .csv). `half_time` may also be a {match: minute} dict.
+
+    Files are read by `io_threads` threads. Files without an up to date
+    cache are parsed and cleaned by `workers` processes as soon as they
+    are read, and their caches written back; cached files never leave
+    the threads.
+    """
+    paths = [Path(p) for p in paths]
+    if not paths:
+        raise ValueError('no event files to load')
+    matches = [p.stem for p in paths]
+    if isinstance(half_time, dict):
+        halves = [half_time[m] for m in matches]
+    else:
+        halves = [half_time] * len(paths)
+
+    tables = [None] * len(paths)
+    with ThreadPoolExecutor(max_workers=io_threads) as threads, \
+            ProcessPoolExecutor(max_workers=workers) as processes:
+        reads = {threads.submit(_read_file, path, half, invert_first_half,
+                                cache_dir, use_cache): i
+                 for i, (path, half) in enumerate(zip(paths, halves))}
+        parsing = {}
+        for future in as_completed(reads):
+            i = reads[future]
+            data, df, cache_file = future.result()
+            if df is not None:
+                tables[i] = df
+            else:
+                parsing[processes.submit(_parse_clean, data, halves[i],
+                                         invert_first_half)] = (i, cache_file)
+
+        writes = []
+        for future in as_completed(parsing):
+            i, cache_file = parsing[future]
+            tables[i] = future.result()
+            if cache_file is not None:
+                writes.append(threads.submit(_write_cache, tables[i],
+                                             cache_file))
+        for write in writes:
+            write.result()
+
+    return _combine(tables, matches)
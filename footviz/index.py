@@ -0,0 +1,115 @@
+"""
+Group index over (Event, Player) so each panel gets its rows without
+scanning the whole table with a boolean mask.
+"""
+import numpy as np
+import pandas as pd
+
+from footviz.instrument import staged
+from footviz.regions import RegionIndex
+from footviz.zones import zone_stats
+
+
+def _codes(col: pd.Series):
+    cat = col.astype('category')
+    return cat.cat.codes.to_numpy(), cat.cat.categories.tolist()
+
+
+class EventIndex:
+    """
+    Rows of `df` sorted by event type, then player, then original order,
+    with the offsets where every (event, player) group starts.
+
+        idx = EventIndex(df)
+        idx.get('Pass')                      # every completed pass
+        idx.get(['Pass', 'Failed Pass'])     # all passes, in time order
+        idx.get('Pass', ['3 Loor', '2 Castro'])
+
+    The index keeps a reference to `df`; rebuild it if `df` changes.
+    """
+
+    @staged('event_index')
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        events, self.events = _codes(df['Event'])
+        players, self.players = _codes(df['Player'])
+        self._event_id = {e: i for i, e in enumerate(self.events)}
+        self._player_id = {p: i for i, p in enumerate(self.players)}
+
+        # Rows without an event or player can't be looked up
+        n = len(self.players)
+        valid = (events >= 0) & (players >= 0)
+        key = np.where(valid, events.astype(np.int64) * n + players, -1)
+
+        # Stable sort keeps the time order inside every group
+        order = np.argsort(key, kind='stable')
+        self._order = order[np.count_nonzero(~valid):]
+        counts = np.bincount(key[valid], minlength=len(self.events) * n)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        # Same for event type alone, so a whole event comes out in time order
+        ev_key = np.where(valid, events, -1)
+        order = np.argsort(ev_key, kind='stable')
+        self._ev_order = order[np.count_nonzero(~valid):]
+        counts = np.bincount(ev_key[valid], minlength=len(self.events))
+        self._ev_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        # Zone counts by (events, players), see zone_counts
+        self._zones = {}
+        # Start/end point index, built by the first region query
+        self._regions = None
+
+    def _slice(self, event, player=None):
+        e = self._event_id.get(event)
+        p = self._player_id.get(player)
+        if e is None or (player is not None and p is None):
+            return self._order[:0]
+        if player is None:
+            a, b = self._ev_offsets[e], self._ev_offsets[e + 1]
+            return self._ev_order[a:b]
+        k = e * len(self.players) + p
+        return self._order[self._offsets[k]:self._offsets[k + 1]]
+
+    def _slices(self, events, players):
+        events = [events] if isinstance(events, str) else list(events)
+        if players is None or isinstance(players, str):
+            players = [players]
+        return [self._slice(e, p) for e in events for p in players]
+
+    def positions(self, events, players=None):
+        """Row positions in `df` (ascending) for the given groups."""
+        slices = self._slices(events, players)
+        if not slices:
+            return self._order[:0]
+        if len(slices) == 1:
+            return slices[0]
+        return np.sort(np.concatenate(slices))
+
+    def get(self, events, players=None):
+        return self.df.iloc[self.positions(events, players)]
+
+    def count(self, events, players=None):
+        return sum(len(s) for s in self._slices(events, players))
+
+    def zone_counts(self, grid, events='Pass', players=None):
+        """
+        Events per zone of footviz.zones.ZONE_GRIDS[grid]. The first call
+        for some events bins them on every grid at once, later calls
+        (the other zone panels) reuse the counts.
+        """
+        key = (events if isinstance(events, str) else tuple(events),
+               players if players is None or isinstance(players, str)
+               else tuple(players))
+        if key not in self._zones:
+            df = self.get(events, players)
+            self._zones[key] = zone_stats(df['X_sb'], df['Y_sb'])
+        return self._zones[key][grid]
+
+    def between(self, events, start=None, end=None):
+        """
+        Rows of `events` starting in region `start` and ending in region
+        `end` (footviz.regions, None for anywhere), in time order.
+        """
+        if self._regions is None:
+            self._regions = RegionIndex(self.df)
+        return self.df.iloc[self._regions.positions(events, start, end)]
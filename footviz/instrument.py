@@ -0,0 +1,121 @@
+"""
+Per-stage timing: wall time, CPU time and peak memory as JSON lines.
+
+Off unless FOOTVIZ_PROFILE is set (or enable() is called):
+
+    FOOTVIZ_PROFILE=1 python pass_network.py            # to stderr
+    FOOTVIZ_PROFILE=prof.jsonl python shotmap.py        # appended to a file
+
+Every stage writes one line when it ends, inner stages before the stage
+that contains them:
+
+    {"stage": "pair_counting", "parent": "build_network", "wall_s": 0.002,
+     "cpu_s": 0.002, "peak_mem_bytes": 181240, "pid": 4242,
+     "script": "pass_network.py", "started": 1705700000.1}
+
+peak_mem_bytes is the highest memory allocated during the stage above what
+was allocated when it started (tracemalloc, so numpy and pandas buffers
+count). Tracing memory slows matplotlib down two to three times; set
+FOOTVIZ_PROFILE_MEMORY=0 for accurate times (peak_mem_bytes is then null).
+Worker processes inherit the variables and append to the same file.
+
+Panels drawn on the figure itself only create their artists; matplotlib
+draws them in the savefig stage. Panels drawn by footviz.compose workers
+include the drawing.
+"""
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+_state = {'dest': None, 'memory': True, 'stack': []}
+
+
+def enable(dest='1', memory=True):
+    """Turn instrumentation on: '1' or '-' for stderr, or a file path."""
+    if not dest or dest == '0':
+        _state['dest'] = None
+        return
+    _state['dest'] = str(dest)
+    _state['memory'] = memory
+    # Same setting for worker processes started from here
+    os.environ['FOOTVIZ_PROFILE'] = str(dest)
+    os.environ['FOOTVIZ_PROFILE_MEMORY'] = str(int(memory))
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def enabled():
+    return _state['dest'] is not None
+
+
+def _write(record):
+    line = json.dumps(record) + '\n'
+    dest = _state['dest']
+    if dest in ('1', '-'):
+        sys.stderr.write(line)
+        return
+    # One write per line in append mode, so processes don't interleave
+    with open(dest, 'a') as f:
+        f.write(line)
+
+
+@contextmanager
+def stage(name):
+    """Time the block as stage `name` (does nothing when disabled)."""
+    if not enabled():
+        yield
+        return
+
+    stack = _state['stack']
+    memory = _state['memory']
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        # The parent's peak so far, before it is reset for this stage
+        stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+    if memory:
+        tracemalloc.reset_peak()
+    frame = {'name': name, 'start_mem': current, 'peak': current}
+    stack.append(frame)
+
+    started = time.time()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        stack.pop()
+        peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+
+        _write({
+            'stage': name,
+            'parent': stack[-1]['name'] if stack else None,
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'peak_mem_bytes': peak - frame['start_mem'] if memory else None,
+            'pid': os.getpid(),
+            'script': Path(sys.argv[0]).name if sys.argv[0] else None,
+            'started': round(started, 3),
+        })
+
+
+def staged(name=None):
+    """Decorator: run the function as a stage (default: its name)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+enable(os.environ.get('FOOTVIZ_PROFILE'),
+       os.environ.get('FOOTVIZ_PROFILE_MEMORY', '1') != '0')
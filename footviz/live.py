@@ -0,0 +1,339 @@
+"""
+Pass network that follows a match while it is being logged.
+
+    python -m footviz.live data/live.csv roster.json -o live.png
+    tail -f data/live.csv | python -m footviz.live - roster.json
+
+Rows are read as they are appended (or from stdin) in the usual
+Team,Player,Event,Mins,Secs,X,Y,X2,Y2 format. Pass counts, average
+positions and totals are updated row by row, and the figure is redrawn
+(at most every --interval seconds) only when any of them changed.
+
+roster.json is one team of the footviz.batch rosters file:
+
+    {"title": "...", "subtitle": "...", "logo": "data/logo.png",
+     "players": {"1": "1 Albarracin", "54 Hurt": "54 Hurtado"}}
+"""
+import argparse
+import bisect
+import csv
+import io
+import json
+import queue
+import sys
+import threading
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+from footviz.assets import ICONS_DIR
+from footviz.events import atomic_write, to_statsbomb
+from footviz.network import EVENT_ORDER, PASS_EVENTS
+
+HEADER = ['Team', 'Player', 'Event', 'Mins', 'Secs', 'X', 'Y', 'X2', 'Y2']
+
+_event_rank = {e: i for i, e in enumerate(EVENT_ORDER)}
+
+
+class LiveNetwork:
+    """
+    Running pass network of `players` (display names, in figure order).
+    Players not in the list (substitutes, late renames) are added after
+    them as they show up, so totals include passes with them.
+
+        live = LiveNetwork(player_list, rename=dict(zip(old, new)))
+        for row in rows:
+            live.add(row)
+        net = live.network()    # same as footviz.network.build_network
+
+    Rows are kept in the order sort_for_pairing would give them (time, then
+    event type, then arrival). A row logged late is inserted where it
+    belongs and only the pairs next to it are recounted, so the counts are
+    always those of the whole file sorted and paired from scratch.
+    """
+
+    def __init__(self, players, rename=None, team=None, half_time=60,
+                 invert_first_half=False):
+        self.roster = list(players)
+        self.players = list(players)
+        self.rename = dict(rename or {})
+        self.team = team
+        self.half_time = half_time
+        self.invert_first_half = invert_first_half
+        self._code = {p: i for i, p in enumerate(self.players)}
+
+        n = len(self.players)
+        self.counts = np.zeros((n, n), dtype=np.int64)
+        self.misordered = 0
+        self.total_passes = 0
+        self._loc_sum = np.zeros((n, 2))
+        self._loc_n = np.zeros(n, dtype=np.int64)
+        # Completed passes (player code, X, Y) for the player heatmaps
+        self._passes = []
+
+        # Sorted timeline: keys and (event, player code) of every row
+        self._keys = []
+        self._events = []
+        # Bumped every time the figure would change
+        self.version = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, row):
+        """
+        Add one event (dict with the CSV columns, values as strings). A
+        malformed row raises ValueError or KeyError and changes nothing.
+        """
+        if self.team is not None and row['Team'] != self.team:
+            return
+        mins, secs = int(row['Mins']), int(row['Secs'])
+        if mins == self.half_time:
+            return
+
+        event = row['Event']
+        # Parsed before anything is changed
+        location = self._location(row) if event == 'Pass' else None
+        player = self.rename.get(row['Player'], row['Player'])
+        code = self._player_code(player)
+
+        key = (mins, secs,
+               _event_rank.get(event, len(_event_rank)), len(self._keys))
+        i = bisect.bisect(self._keys, key)
+        prev = self._events[i - 1] if i > 0 else None
+        nxt = self._events[i] if i < len(self._events) else None
+        self._keys.insert(i, key)
+        self._events.insert(i, (event, code))
+
+        # prev -> nxt is now prev -> new -> nxt
+        changed = self._pair(prev, nxt, -1)
+        changed |= self._pair(prev, (event, code), 1)
+        changed |= self._pair((event, code), nxt, 1)
+
+        if event == 'Pass':
+            self.total_passes += 1
+            changed = True
+            x, y = location
+            self._loc_sum[code] += (x, y)
+            self._loc_n[code] += 1
+            self._passes.append((code, x, y))
+
+        if changed:
+            self.version += 1
+
+    def _player_code(self, player):
+        code = self._code.get(player)
+        if code is None:
+            code = self._code[player] = len(self.players)
+            self.players.append(player)
+            self.counts = np.pad(self.counts, ((0, 1), (0, 1)))
+            self._loc_sum = np.pad(self._loc_sum, ((0, 1), (0, 0)))
+            self._loc_n = np.pad(self._loc_n, (0, 1))
+        return code
+
+    def _pair(self, before, after, sign):
+        """Count (sign=1) or uncount (-1) `after` as received from `before`."""
+        if after is None or after[0] != 'Pass Received':
+            return False
+        if before is None or before[0] not in PASS_EVENTS:
+            self.misordered += sign
+            return False
+
+        passer, receiver = before[1], after[1]
+        # Passes to oneself are ignored
+        if passer == receiver:
+            return False
+        self.counts[passer, receiver] += sign
+        self.counts[receiver, passer] += sign
+        return True
+
+    def _location(self, row):
+        x, y = float(row['X']), float(row['Y'])
+        second = int(row['Mins']) > self.half_time
+        if second != self.invert_first_half:
+            x, y = 100 - x, 100 - y
+        return x, y
+
+    def network(self):
+        """Aggregates in the format of footviz.network.build_network."""
+        passes = pd.DataFrame(self.counts, index=self.players,
+                              columns=self.players)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            loc = self._loc_sum / self._loc_n[:, None]
+        locations = pd.DataFrame(loc, index=self.players, columns=['X', 'Y'])
+        locations['X_sb'], locations['Y_sb'] = to_statsbomb(loc[:, 0],
+                                                            loc[:, 1])
+        return {
+            'passes': passes,
+            'misordered': self.misordered,
+            'max_val': self.counts.max(initial=0),
+            'totals': passes.sum(axis=1),
+            'total_passes': self.total_passes,
+            'locations': locations,
+        }
+
+    def pass_events(self):
+        """Completed passes as an event table, for the player heatmaps."""
+        codes, x, y = (np.array(v) for v in zip(*self._passes)) \
+            if self._passes else (np.array([], dtype=int), [], [])
+        x_sb, y_sb = to_statsbomb(x, y)
+        return pd.DataFrame({
+            'Player': pd.Categorical.from_codes(codes,
+                                                categories=self.players),
+            'Event': pd.Categorical(['Pass'] * len(codes)),
+            'X': np.asarray(x, dtype=np.float32),
+            'Y': np.asarray(y, dtype=np.float32),
+            'X_sb': x_sb.astype(np.float32),
+            'Y_sb': y_sb.astype(np.float32),
+        })
+
+
+def follow(path, poll=1.0):
+    """
+    Lines of `path` as they are written, like tail -f. Yields None every
+    time it has caught up with the end of the file.
+    """
+    with open(path, newline='') as f:
+        partial = ''
+        while True:
+            line = f.readline()
+            if not line:
+                yield None
+                time.sleep(poll)
+                continue
+            # A line still being written has no newline yet
+            partial += line
+            if partial.endswith('\n'):
+                yield partial
+                partial = ''
+
+
+def read_stream(stream, poll=1.0):
+    """
+    Lines of `stream` (stdin) read by a thread. Yields None whenever no
+    line came in for `poll` seconds, so a pending redraw still happens.
+    """
+    lines = queue.Queue()
+
+    def reader():
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    threading.Thread(target=reader, daemon=True).start()
+    while True:
+        try:
+            line = lines.get(timeout=poll)
+        except queue.Empty:
+            yield None
+            continue
+        if line is None:
+            return
+        yield line
+
+
+def parse_line(line, header=HEADER):
+    values = next(csv.reader(io.StringIO(line)), None)
+    if not values or values == header:
+        return None
+    return dict(zip(header, values))
+
+
+def render(live, roster, path, dpi, icons_dir):
+    """Draw the current network to `path`, replacing it in one step."""
+    import matplotlib.pyplot as plt
+    from footviz.network_plot import plot_pass_network, save
+
+    net = live.network()
+    fig = plot_pass_network(live.pass_events(), net, live.roster,
+                            title_text=roster.get('title', ''),
+                            subtitle_text=roster.get('subtitle', ''),
+                            logo=roster.get('logo'),
+                            icons_dir=icons_dir)
+    # Through a temporary file so a viewer never shows half an image
+    with atomic_write(path) as tmp:
+        save(fig, tmp, dpi=dpi)
+    plt.close(fig)
+
+
+def run(source, roster, out, team=None, interval=5.0, poll=1.0,
+        half_time=60, invert_first_half=False, icons_dir=ICONS_DIR,
+        dpi=100):
+    """Follow `source` (a path, or '-' for stdin) and keep `out` up to date."""
+    players = roster['players']
+    live = LiveNetwork(list(players.values()), rename=players, team=team,
+                       half_time=half_time,
+                       invert_first_half=invert_first_half)
+    lines = read_stream(sys.stdin, poll) if source == '-' \
+        else follow(source, poll)
+
+    drawn, last_draw = 0, 0.0
+    for line in lines:
+        # None: caught up with the input, only check if a redraw is due
+        row = parse_line(line) if line is not None else None
+        if row is not None:
+            try:
+                live.add(row)
+            except (ValueError, KeyError) as e:
+                # A bad hand-logged row must not stop the match
+                print(f'Skipped row {line.strip()!r}: {e!r}', file=sys.stderr)
+
+        if live.version != drawn and time.monotonic() - last_draw >= interval:
+            drawn, last_draw = _redraw(live, roster, out, dpi, icons_dir)
+
+    # stdin closed
+    if live.version != drawn:
+        _redraw(live, roster, out, dpi, icons_dir)
+    return live
+
+
+def _redraw(live, roster, out, dpi, icons_dir):
+    render(live, roster, out, dpi, icons_dir)
+    print(f'{live.total_passes} passes, '
+          f'{live.misordered} misordered -> {out}')
+    return live.version, time.monotonic()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Live pass network from a growing events CSV.')
+    parser.add_argument('source', help="events CSV to follow, or - for stdin")
+    parser.add_argument('roster', help='roster JSON of the team')
+    parser.add_argument('-o', '--out', default='live_network.png')
+    parser.add_argument('--team', help='only rows of this Team')
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help='seconds between redraws (default 5)')
+    parser.add_argument('--poll', type=float, default=1.0,
+                        help='seconds between file (or stdin) checks '
+                             '(default 1)')
+    icons = parser.add_mutually_exclusive_group()
+    icons.add_argument('--icons-dir', default=ICONS_DIR,
+                       help='folder with tw.png/ig.png for the credits '
+                            '(default footviz/icons)')
+    icons.add_argument('--no-icons', dest='icons_dir', action='store_const',
+                       const=None, help='credits without the icons')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--half-time', type=int, default=60)
+    parser.add_argument('--invert-first-half', action='store_true')
+    args = parser.parse_args(argv)
+
+    with open(args.roster) as f:
+        roster = json.load(f)
+
+    try:
+        run(args.source, roster, args.out, team=args.team,
+            interval=args.interval, poll=args.poll,
+            half_time=args.half_time,
+            invert_first_half=args.invert_first_half,
+            icons_dir=args.icons_dir, dpi=args.dpi)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Player metrics of a pass network, from its adjacency matrix (pass
+counts between players, see footviz.network.build_network):
+
+    degree               teammates the player combined with
+    strength             passes given and received with teammates
+    eigenvector          weighted (eigenvector) centrality, max 1
+    betweenness          share of shortest paths between teammates through
+                         the player (path length: 1 / passes per link)
+    clustering           share of the player's partners that also combine
+    weighted_clustering  the same weighted by pass counts (geometric mean
+                         of the three links of each triangle)
+
+Everything is matrix algebra on the whole network (sparse where it
+helps), so a season's network, or every team of a league, takes seconds.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import shortest_path
+
+from footviz.instrument import staged
+
+COLUMNS = ['degree', 'strength', 'eigenvector', 'betweenness', 'clustering',
+           'weighted_clustering']
+
+
+def _eigenvector(w, iterations=1000, tol=1e-10):
+    """Power iteration of (W + I) on the sparse matrix, scaled to max 1."""
+    n = w.shape[0]
+    x = np.ones(n) / max(n, 1)
+    for _ in range(iterations):
+        new = w @ x + x
+        norm = np.abs(new).max()
+        if norm == 0:
+            return np.zeros(n)
+        new /= norm
+        if np.abs(new - x).max() < tol:
+            break
+        x = new
+    return new
+
+
+def _clustering(w):
+    """Unweighted and weighted (Onnela) local clustering."""
+    a = (w > 0).astype(float)
+    k = a.sum(axis=1)
+    pairs = k * (k - 1)
+    # Triangles through every player: diagonal of A^3, W^(1/3)^3
+    triangles = np.einsum('ij,jk,ki->i', a, a, a)
+    scaled = np.cbrt(w / w.max()) if w.max() > 0 else w
+    weighted = np.einsum('ij,jk,ki->i', scaled, scaled, scaled)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (np.where(pairs > 0, triangles / pairs, 0),
+                np.where(pairs > 0, weighted / pairs, 0))
+
+
+def _betweenness(w):
+    """
+    Normalized betweenness with path length 1 / passes. Counts the
+    shortest paths between every pair in matrix form: sigma[s] solves
+    (I - P_s^T) sigma[s] = e_s, P_s being the links on shortest paths
+    from s. Memory grows as n^3, fine for teams and seasons of a team.
+    """
+    n = w.shape[0]
+    if n < 3:
+        return np.zeros(n)
+    with np.errstate(divide='ignore'):
+        length = np.where(w > 0, 1 / w, 0)
+    dist = shortest_path(sparse.csr_matrix(length), directed=False)
+
+    reach = np.isfinite(dist)
+    d = np.where(reach, dist, np.inf)
+    tol = 1e-9 * np.nanmax(np.where(reach, d, np.nan), initial=1.0)
+
+    # Link u->t is on a shortest path from s: d[s,u] + len(u,t) == d[s,t]
+    # (inf - inf between unreachable players is NaN, never on a path)
+    edge = np.where(w > 0, length, np.inf)
+    with np.errstate(invalid='ignore'):
+        on_dag = np.abs(d[:, :, None] + edge[None] - d[:, None, :]) <= tol
+        through = np.abs(d[:, :, None] + d[None] - d[:, None, :]) <= tol
+    on_dag &= np.isfinite(d[:, :, None] + edge[None])
+
+    # Number of shortest paths from every source (batched linear solve)
+    system = np.eye(n)[None] - on_dag.transpose(0, 2, 1)
+    sigma = np.linalg.solve(system, np.eye(n)[:, :, None])[..., 0]
+    sigma = np.rint(sigma)
+
+    # Fraction of the s->t shortest paths through v
+    through &= reach[:, :, None] & reach[None, :, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = sigma[:, :, None] * sigma[None, :, :] / sigma[:, None, :]
+    share = np.where(through & (sigma[:, None, :] > 0), share, 0)
+    # v must be strictly inside the path
+    idx = np.arange(n)
+    share[idx, idx, :] = 0
+    share[:, idx, idx] = 0
+    share[idx, :, idx] = 0
+
+    # Undirected: every pair counted twice
+    between = share.sum(axis=(0, 2)) / 2
+    return between / ((n - 1) * (n - 2) / 2)
+
+
+@staged('network_metrics')
+def network_metrics(passes: pd.DataFrame):
+    """Metrics of every player of the (symmetric) pass count matrix."""
+    w = passes.to_numpy(dtype=float)
+    np.fill_diagonal(w, 0)
+    ws = sparse.csr_matrix(w)
+
+    clustering, weighted_clustering = _clustering(w)
+    # Betweenness among players with at least one link, so players without
+    # passes (or a padded roster) don't change everyone's normalization
+    linked = w.sum(axis=1) > 0
+    betweenness = np.zeros(len(w))
+    betweenness[linked] = _betweenness(w[np.ix_(linked, linked)])
+    return pd.DataFrame({
+        'degree': np.asarray((ws > 0).sum(axis=1)).ravel(),
+        'strength': np.asarray(ws.sum(axis=1)).ravel(),
+        'eigenvector': _eigenvector(ws),
+        'betweenness': betweenness,
+        'clustering': clustering,
+        'weighted_clustering': weighted_clustering,
+    }, index=passes.index, columns=COLUMNS)
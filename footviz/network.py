@@ -0,0 +1,106 @@
+"""
+Pass network aggregates built from a cleaned event table
+(see footviz.events.load_events).
+"""
+import numpy as np
+import pandas as pd
+
+from footviz.events import to_statsbomb
+from footviz.instrument import staged
+from footviz.roster import Roster
+
+# Events that are followed by a 'Pass Received' from the receiver
+PASS_EVENTS = ['Pass', 'Assist']
+
+# Sort in arbitrary order so passes/assists appear just before pass received
+# This way we create the connections between passers/receivers
+EVENT_ORDER = ['Failed Pass', 'Pass', 'Assist', 'Pass Received', 'Shot', 'Goal']
+
+
+def player_index(df: pd.DataFrame):
+    """Stable player order: category order if Player is categorical."""
+    if isinstance(df['Player'].dtype, pd.CategoricalDtype):
+        return df['Player'].cat.categories.tolist()
+    return sorted(df['Player'].dropna().unique().tolist())
+
+
+@staged('pair_counting')
+def pass_matrix(df: pd.DataFrame, players=None):
+    """
+    Count pass combinations between every pair of players.
+
+    Events must be sorted so each 'Pass'/'Assist' comes right before the
+    matching 'Pass Received'. Returns a symmetric players x players
+    DataFrame of counts and the number of 'Pass Received' rows that did not
+    follow a pass (misordered rows, not counted).
+    """
+    if players is None:
+        players = player_index(df)
+    n = len(players)
+
+    received = (df['Event'] == 'Pass Received').to_numpy()
+    after_pass = np.zeros(len(df), dtype=bool)
+    after_pass[1:] = df['Event'].isin(PASS_EVENTS).to_numpy()[:-1]
+
+    paired = received & after_pass
+    misordered = int((received & ~after_pass).sum())
+
+    # Pair each receiver with the player on the previous row
+    codes = pd.Categorical(df['Player'], categories=players).codes
+    passer = np.full_like(codes, -1)
+    passer[1:] = codes[:-1]
+    passer, receiver = passer[paired], codes[paired]
+
+    # Players not in the index and passes to oneself are ignored
+    keep = (passer >= 0) & (receiver >= 0) & (passer != receiver)
+    counts = np.bincount(passer[keep].astype(np.int64) * n + receiver[keep],
+                         minlength=n * n).reshape(n, n)
+    counts = counts + counts.T
+
+    return pd.DataFrame(counts, index=players, columns=players), misordered
+
+
+@staged('sort')
+def sort_for_pairing(df: pd.DataFrame):
+    df = df.copy()
+    df['Event'] = pd.Categorical(df['Event'], EVENT_ORDER)
+    return df.sort_values(by=['Mins', 'Secs', 'Event']).reset_index()
+
+
+def rename_players(df: pd.DataFrame, old_player_list, player_list):
+    """Parallel lists of raw labels and names, see footviz.roster.Roster."""
+    return Roster.from_lists(old_player_list, player_list).apply(df)
+
+
+@staged('average_location')
+def average_locations(df: pd.DataFrame, players):
+    """
+    Average location of each player's completed passes: X, Y in Opta
+    units and X_sb, Y_sb (the average, converted) in StatsBomb units.
+    """
+    pdf = df[df['Event'] == 'Pass']
+    loc = pdf.groupby('Player', observed=False)[['X', 'Y']].mean()
+    loc = loc.reindex(players)
+    loc['X_sb'], loc['Y_sb'] = to_statsbomb(loc['X'], loc['Y'])
+    return loc
+
+
+@staged()
+def build_network(df: pd.DataFrame, players=None):
+    """
+    Everything the pass network figure needs from a sorted, renamed event
+    table: pair counts, totals and average pass locations.
+    """
+    passes, misordered = pass_matrix(df, players)
+    players = passes.index.tolist()
+    return {
+        'passes': passes,
+        'misordered': misordered,
+        # Highest pass count for a single combination of players
+        'max_val': passes.to_numpy().max(initial=0),
+        # Passes per player (Marker size)
+        'totals': passes.sum(axis=1),
+        # Total number of passes of the team (Marker size)
+        'total_passes': int((df['Event'] == 'Pass').sum()),
+        'locations': average_locations(df, players),
+    }
@@ -0,0 +1,453 @@
+"""
+Pass network figure: network on top, one pass heatmap per player below.
+Takes the aggregates from footviz.network.build_network.
+"""
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from mplsoccer import Pitch
+from matplotlib import patheffects
+from matplotlib.colors import to_rgba_array
+from matplotlib.patches import FancyArrow
+
+from footviz.assets import ICONS_DIR, add_image
+from footviz.compose import Panel, draw_panels, prepare_axes
+from footviz.heatmap import density_grids
+from footviz.index import EventIndex
+from footviz.instrument import stage, staged
+from footviz.pitches import draw_pitch
+
+BG_COLOR = '#faf9f4'
+BASE_COLOR = '#de9314'
+
+# Resolution of draft renders
+PREVIEW_DPI = 60
+
+
+def make_pitch():
+    return Pitch(
+        # goal_type='box',
+        line_color='#03191E',
+        # line_alpha=0.5,
+        linewidth=2,
+        # line_color='black',
+        line_zorder=2
+    )
+
+
+def create_figure(bg_color=BG_COLOR, players=11):
+    """
+    Frame of the report: network on top, then a 3 column grid of player
+    heatmaps and 2 more below (3 rows above them, more when `players`
+    doesn't fit, at the same figure size).
+    """
+    fig = plt.figure(layout='constrained', figsize=(9.5, 12), dpi=250)
+    fig.patch.set_facecolor(bg_color)
+
+    # Axis for title
+    h = 0.1
+    ax_title = fig.add_axes([0, 1, 1, h], zorder=1)
+    ax_title.axis('off')
+
+    # Axis for credits
+    h = 0.1
+    ax_annotate = fig.add_axes([0, -h, 1, h], zorder=1)
+    ax_annotate.axis('off')
+
+    subfigs = fig.subfigures(3, 1,
+                             wspace=0.01,
+                             hspace=0.01,
+                             height_ratios=[1, 1.5, 0.5])
+
+    axsTop = subfigs[0].subplots(1, 1)
+    rows = max(3, math.ceil((players - 2) / 3))
+    axsMiddle = subfigs[1].subplots(rows, 3)
+    axsBot = subfigs[2].subplots(1, 2)
+
+    axs = {
+        'title': ax_title,
+        'annotate': ax_annotate,
+        'network': axsTop,
+        'players': [*axsMiddle.flat, *axsBot.flat],
+    }
+    return fig, subfigs, axs
+
+
+# ------------------------------------------------------------------- PANELS
+# Each panel draws its own pitch and content. Player titles are part of the
+# frame, and what a panel draws outside its axes is kept out of the layout,
+# so the layout is the same whether panels are drawn here or in
+# footviz.compose.
+
+def draw_network(ax, pitch, net, player_list, bg_color=BG_COLOR,
+                 base_color=BASE_COLOR):
+    # Starts inside the pitch padding, so it belongs to the panel
+    ax.text(
+        x=60,
+        y=-1,
+        s='Red de Pases',
+        size=18,
+        ha='center',
+        va='bottom',
+        in_layout=False,
+    )
+
+    draw_pitch(pitch, ax)
+    ax.set_facecolor(bg_color)
+
+    # Add Arrow
+    x = 0.6
+    y = 0.08
+    l1 = FancyArrow(x=0.6, y=0.08, dx=0.33, dy=0,
+                    transform=ax.transAxes,
+                    figure=ax.figure,
+                    length_includes_head=True,
+                    head_length=0.01,
+                    head_width=0.02,
+                    zorder=50,
+                    color='black',
+                    )
+
+    ax.figure.lines.extend([l1])
+
+    ax.text(x=120*x+1, y=80*(1-y)+2,
+            s='Dirección de Ataque',
+            ha='left',
+            size='12',
+            )
+
+    # Node positions in StatsBomb coordinates (NaN, no node, for roster
+    # players without events)
+    loc = net['locations'].reindex(player_list)
+    x, y = loc['X_sb'].to_numpy(), loc['Y_sb'].to_numpy()
+
+    # ---------------------------------------------------------- 1. Pass Lines
+    draw_pass_lines(pitch, ax, net, player_list, x, y)
+
+    # -------------------------------------------- 2. Average Passing Location
+    # Path effects
+    path_eff = [patheffects.Stroke(linewidth=1.5, foreground='black'),
+                patheffects.Normal()]
+
+    # With 10% of total team passes, marker size will be s1 (average)
+    r = (net['totals'].reindex(player_list, fill_value=0).to_numpy()
+         / net['total_passes'])
+
+    th1 = -0.4
+    s1 = 400
+
+    th2 = 0.4
+    s2 = 10
+
+    marker_s = (s1 * th1) + (10 * r * s1 * (1-th1))
+    text_s = (s2 * th2) + (10 * r * s2 * (1-th2))
+
+    # Players without passes yet (live mode) have no node
+    shown = np.isfinite(x) & np.isfinite(y) & (marker_s > 0)
+
+    # Player Icons
+    pitch.scatter(
+        x=x[shown],
+        y=y[shown],
+        ax=ax,
+        s=marker_s[shown],
+        marker='o',
+        facecolor=base_color,
+        # facecolor='crimson',
+        # facecolor='#ef4146',
+        edgecolors='black',
+        linewidths=1,
+        # alpha=0.5,
+        zorder=2,
+    )
+
+    # Player Numbers
+    for i in np.flatnonzero(shown):
+        pl = player_list[i]
+        ax.text(
+            x=x[i],
+            y=y[i],
+            s=pl.split()[0],
+            size=text_s[i],
+            c='white',
+            ha='center',
+            va='center',
+            path_effects=path_eff,
+        )
+
+
+def draw_pass_lines(pitch, ax, net, player_list, x, y, color='black'):
+    """
+    Every pass line of the network as one LineCollection.
+
+    `x`, `y` are the players' positions already on the pitch. Counts are
+    symmetric, so each pair is drawn once (upper triangle) with the alpha of
+    the two overlapping lines it replaces.
+    """
+    passes = net['passes'].reindex(index=player_list, columns=player_list,
+                                   fill_value=0).to_numpy()
+    i, j = np.triu_indices(len(player_list), k=1)
+
+    count = passes[i, j]
+    lw = np.where(count > 3, count, 0.5)
+    alpha = ((lw / max(net['max_val'], 1)) * 1.1) / 2
+    alpha = 1 - (1 - alpha) ** 2
+
+    colors = np.repeat(to_rgba_array(color), len(i), axis=0)
+    colors[:, 3] = np.clip(alpha, 0, 1)
+
+    return pitch.lines(
+        xstart=x[i],
+        ystart=y[i],
+        xend=x[j],
+        yend=y[j],
+        ax=ax,
+        color=colors,
+        lw=(lw * 1.3) / 2,
+    )
+
+
+@staged()
+def player_heatmaps(idx, player_list, pitch, mode='grid'):
+    """
+    Passes of every player as panel arguments: (x, y, grid, extent) each.
+    mode='grid' smooths every player's passes in one go (footviz.heatmap)
+    and hands each panel its grid; mode='kde' leaves grid as None and the
+    panel runs mplsoccer's kdeplot (1000 filled contours, much slower).
+    """
+    # Passes of every player, in StatsBomb coordinates
+    pdf = idx.get('Pass', player_list)
+    xstart, ystart = pdf['X_sb'].to_numpy(), pdf['Y_sb'].to_numpy()
+    codes = pd.Categorical(pdf['Player'], categories=player_list).codes
+
+    grids, extent = [None] * len(player_list), None
+    if mode == 'grid':
+        dim = pitch.dim
+        extent = (min(dim.left, dim.right), max(dim.left, dim.right),
+                  min(dim.top, dim.bottom), max(dim.top, dim.bottom))
+        grids = density_grids(xstart, ystart, codes, len(player_list), extent)
+
+    return [(xstart[codes == c], ystart[codes == c], grids[c], extent)
+            for c in range(len(player_list))]
+
+
+def draw_player_heatmap(ax, pitch, x, y, grid=None, extent=None,
+                        bg_color=BG_COLOR):
+    """One player's pass heatmap, from player_heatmaps."""
+    draw_pitch(pitch, ax)
+    ax.set_facecolor(bg_color)
+
+    # Density Estimation heatmap
+    if grid is not None:
+        ax.imshow(grid,
+                  extent=extent,
+                  origin='lower',
+                  cmap='OrRd',
+                  vmin=0,
+                  vmax=1,
+                  interpolation='bilinear',
+                  aspect=ax.get_aspect(),
+                  zorder=1,
+                  )
+    else:
+        pitch.kdeplot(
+            x,
+            y,
+            ax=ax,
+            # fill using 100 levels so it looks smooth
+            fill=True, levels=1000,
+            # shade the lowest area, so it looks smooth
+            # so even if there are no events it gets some color
+            thresh=0,
+            cut=4,
+            # extended the cut so it reaches the bottom edge
+            # cmap='Reds',
+            cmap='OrRd',
+            # cmap='Oranges',
+            # cmap=ccmap,
+        )
+
+    pitch.scatter(
+        x=x,
+        y=y,
+        ax=ax,
+        s=14,
+        marker='o',
+        facecolor='white',
+        # facecolor='crimson',
+        # facecolor='#ef4146',
+        edgecolors='black',
+        linewidths=1,
+        # alpha=0.5,
+        zorder=2,
+    )
+
+
+def draw_empty(ax, pitch, bg_color=BG_COLOR):
+    """More axes than players (e.g. short roster): leave them empty."""
+    draw_pitch(pitch, ax)
+    ax.set_facecolor(bg_color)
+    ax.axis('off')
+
+
+# -------------------------------------------------------------------- FRAME
+@staged('panel_titles')
+def draw_titles(axs, player_list):
+    for pl, ax in zip(player_list, axs['players']):
+        number, _, name = pl.partition(' ')
+        ax.set_title(f'{number}. {name}', size=15)
+
+
+@staged('title')
+def draw_title(fig, ax_title, title_text, subtitle_text, logo=None,
+               preview=False):
+    # -- Transformation functions (thanks Son of a corner)
+    DC_to_FC = ax_title.transData.transform
+    FC_to_NFC = fig.transFigure.inverted().transform
+    # Transform for title axes
+    ax_title_tf = lambda x: FC_to_NFC(DC_to_FC(x))
+
+    # Add team logo
+    if logo is not None:
+        ax_coords = ax_title_tf((0.065, 0.5))
+        ax_size = 0.1
+        add_image(
+            fig,
+            [ax_coords[0]-ax_size/2, ax_coords[1]-ax_size/2, ax_size, ax_size],
+            logo, preview, anchor='W', zorder=1
+        )
+
+    ax_title.text(
+        x=0.5,
+        y=0.8,
+        s=title_text,
+        size=24,
+        ha='center',
+        va='top',
+        # weight='bold',
+    )
+
+    ax_title.text(
+        x=0.5,
+        y=0.4,
+        s=subtitle_text,
+        size=18,
+        ha='center',
+        va='top',
+        color="#030303",
+        alpha=0.6,
+    )
+
+
+@staged('credits')
+def draw_credits(fig, ax_annotate, icons_dir=ICONS_DIR,
+                 base_color=BASE_COLOR, preview=False):
+    # Source label
+    ax_annotate.text(
+        x=1,
+        y=0.5,
+        s='Datos y Gráficos: Daniel Granja C.',
+        va='bottom',
+        ha='right',
+        fontsize=20,
+        # weight='bold',
+        # ontproperties=robotto_regular.prop,
+        color='#030303',
+        alpha=0.7,
+    )
+
+    # Twitter Account
+    ax_annotate.text(
+        x=1,
+        y=0,
+        s='@DGCFutbol',
+        va='bottom',
+        ha='right',
+        fontsize=24,
+        weight='bold',
+        # ontproperties=robotto_regular.prop,
+        # color='#941C2F',
+        color=base_color,
+        # color='#0b4393',
+        alpha=1,
+    )
+
+    # -- Add Social Media logo
+    if icons_dir is None:
+        return
+
+    # Twitter Logo
+    ax_size1 = 0.05
+    x1 = 0.7
+    y1 = -0.102
+
+    add_image(
+        fig, (x1, y1, ax_size1, ax_size1), Path(icons_dir) / 'tw.png',
+        preview, zorder=1, anchor='SW',
+    )
+
+    # Instagram logo
+    ax_size2 = 0.065
+    x2 = x1 - ax_size2
+    y2 = y1 - 0.0048  # ax2 is larger, so we center the image
+    v = abs((ax_size2-ax_size1)/2)
+
+    add_image(
+        fig, (x2, y2-v, ax_size2, ax_size2), Path(icons_dir) / 'ig.png',
+        preview, zorder=1, anchor='SW',
+    )
+
+
+@staged('frame')
+def build_pass_network(df, net, player_list, title_text='',
+                       subtitle_text='', logo=None, icons_dir=ICONS_DIR,
+                       bg_color=BG_COLOR, base_color=BASE_COLOR,
+                       heatmap_mode='grid', preview=False):
+    """
+    Figure with its frame (titles, logo, credits) and the list of panels
+    still to draw on it. preview=True is a draft with the same layout:
+    grid heatmaps (never KDE) and grey boxes instead of the images.
+    """
+    if preview:
+        heatmap_mode = 'grid'
+    fig, subfigs, axs = create_figure(bg_color, len(player_list))
+    pitch = make_pitch()
+
+    panels = [Panel(axs['network'], pitch, draw_network,
+                    (pitch, net, player_list, bg_color, base_color))]
+    heatmaps = player_heatmaps(EventIndex(df), player_list, pitch,
+                               heatmap_mode)
+    for c, ax in enumerate(axs['players']):
+        if c < len(heatmaps):
+            panels.append(Panel(ax, pitch, draw_player_heatmap,
+                                (pitch, *heatmaps[c], bg_color)))
+        else:
+            panels.append(Panel(ax, pitch, draw_empty, (pitch, bg_color)))
+    for panel in panels:
+        prepare_axes(panel.pitch, panel.ax)
+
+    draw_titles(axs, player_list)
+    draw_title(fig, axs['title'], title_text, subtitle_text, logo, preview)
+    draw_credits(fig, axs['annotate'], icons_dir, base_color, preview)
+    return fig, panels
+
+
+def plot_pass_network(df, net, player_list, title_text='', subtitle_text='',
+                      logo=None, icons_dir=ICONS_DIR, bg_color=BG_COLOR,
+                      base_color=BASE_COLOR, heatmap_mode='grid',
+                      preview=False):
+    """Draw the whole report and return the figure (not saved)."""
+    fig, panels = build_pass_network(df, net, player_list, title_text,
+                                     subtitle_text, logo, icons_dir,
+                                     bg_color, base_color, heatmap_mode,
+                                     preview)
+    draw_panels(panels)
+    return fig
+
+
+def save(fig, path, dpi=250):
+    with stage('savefig'):
+        fig.savefig(path, bbox_inches='tight', dpi=dpi)
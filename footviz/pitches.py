@@ -0,0 +1,234 @@
+"""
+Cached pitch backgrounds.
+
+mplsoccer builds every line, arc and spot of a pitch as a separate artist on
+each draw. Here the pitch is drawn once on a scratch axes, its markings are
+kept as paths in data coordinates (in memory and pickled on disk) and every
+later draw adds them back as a few collections, in the same drawing order
+and with the same styles. Pitches with markings a collection can't draw the
+same (square spots, shading) are drawn by mplsoccer every time.
+
+    draw_pitch(pitch, ax)   # instead of pitch.draw(ax=ax)
+
+Paths and line widths (in points) don't depend on the output resolution, so
+the same cache entry serves the 250 DPI render and any preview. Entries are
+keyed by every argument of the pitch and the mplsoccer version, as an
+upgrade may draw other markings.
+"""
+import hashlib
+import inspect
+import os
+import pickle
+from pathlib import Path
+
+import mplsoccer
+import numpy as np
+from matplotlib.collections import PathCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Arc, Ellipse
+from matplotlib.path import Path as MplPath
+
+from footviz.events import atomic_write
+
+# Bump when the captured format changes so old caches are not reused
+CACHE_VERSION = 2
+
+CACHE_DIR = Path(os.environ.get('FOOTVIZ_CACHE',
+                                Path.home() / '.cache' / 'footviz')) / 'pitches'
+
+_memory = {}
+
+
+def pitch_key(pitch):
+    """
+    Key of everything the pitch was built with (every argument of its
+    class), or None if it doesn't keep them all and can't be cached.
+    """
+    params = [name for name in inspect.signature(type(pitch)).parameters]
+    attrs = vars(pitch)
+    if any(name not in attrs for name in params):
+        return None
+    values = [type(pitch).__name__, CACHE_VERSION, mplsoccer.__version__]
+    values += [(name, attrs[name]) for name in sorted(params)]
+    return hashlib.sha1(repr(values).encode()).hexdigest()
+
+
+def _stretched_angles(arc):
+    """Angles Arc draws between: stretched along with a non-circular arc."""
+    theta1, theta2 = arc.theta1, arc.theta2
+    full = theta1 != theta2 and theta1 % 360 == theta2 % 360
+    if arc.width == arc.height or full:
+        return theta1, theta2
+    scale = arc.width / arc.height
+    theta = np.deg2rad([theta1, theta2])
+    stretched = np.rad2deg(np.arctan2(scale * np.sin(theta), np.cos(theta)))
+    return tuple((stretched + 360) % 360)
+
+
+def _patch_path(patch):
+    path = patch.get_path()
+    if isinstance(patch, Arc):
+        path = MplPath.arc(*_stretched_angles(patch))
+    return path.transformed(patch.get_patch_transform())
+
+
+def _marking(artist, ax):
+    """
+    One artist as (style, path): style is what the artists of a collection
+    share. None for what a collection can't draw the same.
+    """
+    if isinstance(artist, Line2D):
+        if artist.get_transform() != ax.transData \
+                or artist.get_marker() not in ('None', '', None) \
+                or artist.get_drawstyle() != 'default':
+            return None
+        dashed = artist.get_linestyle() not in ('-', 'solid')
+        style = ('line', artist.get_zorder(),
+                 artist.get_dash_capstyle() if dashed
+                 else artist.get_solid_capstyle(),
+                 artist.get_dash_joinstyle() if dashed
+                 else artist.get_solid_joinstyle())
+        return style, {
+            'path': (artist.get_xydata(), None),
+            'facecolor': 'none',
+            'edgecolor': to_rgba(artist.get_color(), artist.get_alpha()),
+            'linewidth': artist.get_linewidth(),
+            'linestyle': artist.get_linestyle(),
+        }
+    if isinstance(artist, (Ellipse, Arc)):
+        if artist.get_data_transform() != ax.transData \
+                or artist.get_hatch():
+            return None
+        path = _patch_path(artist)
+        style = ('patch', artist.get_zorder(), artist.get_capstyle(),
+                 artist.get_joinstyle())
+        return style, {
+            'path': (path.vertices, path.codes),
+            'facecolor': artist.get_facecolor(),
+            'edgecolor': artist.get_edgecolor(),
+            'linewidth': artist.get_linewidth(),
+            'linestyle': artist.get_linestyle(),
+        }
+    return None
+
+
+def capture(pitch):
+    """
+    Draw `pitch` on a scratch axes and return its markings as plain data:
+    one group per run of artists (in drawing order) that a single
+    collection draws the same, with paths, colours, widths and styles.
+    None if some marking can't be drawn that way (squares, shading,
+    anything but lines, circles and arcs).
+    """
+    fig = Figure()
+    ax = fig.add_subplot()
+    pitch.draw(ax=ax)
+    if ax.collections or ax.images or ax.texts or ax.artists:
+        return None
+
+    # The order Axes.draw uses: by zorder, then as added
+    added = {id(a): i for i, a in enumerate(ax.get_children())}
+    artists = sorted([*ax.lines, *ax.patches],
+                     key=lambda a: (a.get_zorder(), added[id(a)]))
+    groups = []
+    for artist in artists:
+        marking = _marking(artist, ax)
+        if marking is None:
+            return None
+        style, item = marking
+        if not groups or groups[-1]['style'] != style:
+            groups.append({'style': style, 'paths': [], 'facecolors': [],
+                           'edgecolors': [], 'linewidths': [],
+                           'linestyles': []})
+        group = groups[-1]
+        group['paths'].append(item['path'])
+        for name in ['facecolor', 'edgecolor', 'linewidth', 'linestyle']:
+            group[name + 's'].append(item[name])
+    return groups
+
+
+def cached_markings(pitch, cache_dir=None):
+    """Captured markings of `pitch` (None: draw it with pitch.draw)."""
+    key = pitch_key(pitch)
+    if key is None:
+        return None
+    if key in _memory:
+        return _memory[key]
+
+    cache_file = Path(cache_dir or CACHE_DIR) / f'{key}.pkl'
+    if cache_file.exists():
+        with open(cache_file, 'rb') as f:
+            groups = pickle.load(f)
+    else:
+        groups = capture(pitch)
+        with atomic_write(cache_file) as tmp, open(tmp, 'wb') as f:
+            pickle.dump(groups, f)
+
+    _memory[key] = groups
+    return groups
+
+
+def _frame(pitch, ax, background=False):
+    """
+    Limits, aspect and ticks of `pitch` (and its colour with background),
+    without the markings. The only calls to mplsoccer's private API: if a
+    version doesn't have them, the pitch is drawn and its markings removed.
+    """
+    set_axes = getattr(pitch, '_set_axes', None)
+    set_background = getattr(pitch, '_set_background', None)
+    if set_axes and set_background:
+        set_axes(ax)
+        if background:
+            set_background(ax)
+    else:
+        pitch.draw(ax=ax)
+        for artist in [*ax.lines, *ax.patches, *ax.collections]:
+            artist.remove()
+
+
+def _hide_axis(pitch, ax):
+    # Without ticks or labels the x/y axis objects are hidden too, so the
+    # layout and tight bbox don't compute ticks nobody sees
+    if not (pitch.tick or pitch.label):
+        ax.xaxis.set_visible(False)
+        ax.yaxis.set_visible(False)
+
+
+def set_axes(pitch, ax):
+    """Limits, aspect and hidden ticks of `pitch`, as mplsoccer sets them."""
+    _frame(pitch, ax)
+    _hide_axis(pitch, ax)
+
+
+def draw_pitch(pitch, ax, cache_dir=None):
+    """Same result as pitch.draw(ax=ax), using the cached markings."""
+    # Stripes and grass are drawn by the background itself: nothing to cache
+    groups = None
+    if not (pitch.stripe or pitch.pitch_color == 'grass'):
+        groups = cached_markings(pitch, cache_dir)
+    if groups is None:
+        pitch.draw(ax=ax)
+        _hide_axis(pitch, ax)
+        return
+
+    # Limits, aspect, hidden axis and pitch colour, as mplsoccer does them
+    _frame(pitch, ax, background=True)
+    _hide_axis(pitch, ax)
+
+    for group in groups:
+        paths = [MplPath(np.asarray(v), c) for v, c in group['paths']]
+        kind, zorder, capstyle, joinstyle = group['style']
+        collection = PathCollection(
+            paths,
+            facecolors=group['facecolors'],
+            edgecolors=group['edgecolors'],
+            linewidths=group['linewidths'],
+            linestyles=group['linestyles'],
+            capstyle=capstyle,
+            joinstyle=joinstyle,
+            zorder=zorder,
+            transform=ax.transData,
+        )
+        ax.add_collection(collection, autolim=False)
@@ -0,0 +1,111 @@
+"""
+Pitch regions (rectangles in Opta units) and an index over the start and
+end points of events, for questions like "passes that start outside the
+final third and end inside it":
+
+    idx.between('Pass', OUTSIDE_FINAL_THIRD, FINAL_THIRD_ZONE)
+    idx.between(['Pass', 'Failed Pass'], end=BOX)
+    idx.between('Pass', start=ZONE_14)
+
+Rows are bucketed by event type, start cell and end cell of a uniform
+grid, so a query reads the buckets its regions overlap and only checks
+the points of those. Region edges are included.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from footviz.zones import FINAL_THIRD
+
+
+class Region(namedtuple('Region', ['xmin', 'xmax', 'ymin', 'ymax'])):
+    """Rectangle in Opta units (x to the attacking goal, y from the right)."""
+    __slots__ = ()
+
+    def contains(self, x, y):
+        return (x >= self.xmin) & (x <= self.xmax) \
+            & (y >= self.ymin) & (y <= self.ymax)
+
+
+PITCH = Region(0, 100, 0, 100)
+FINAL_THIRD_ZONE = Region(FINAL_THIRD, 100, 0, 100)
+OUTSIDE_FINAL_THIRD = Region(0, FINAL_THIRD, 0, 100)
+# Penalty box and the channels between its edge and the six yard box
+BOX = Region(83, 100, 21.1, 78.9)
+HALF_SPACE_LEFT = Region(0, 100, 63.2, 78.9)
+HALF_SPACE_RIGHT = Region(0, 100, 21.1, 36.8)
+# Centre of the 18 zone grid, just outside the box
+ZONE_14 = Region(4 / 6 * 100, 5 / 6 * 100, 100 / 3, 200 / 3)
+
+
+class RegionIndex:
+    """
+    Rows of `df` (Opta X, Y, X2, Y2) sorted by (event, start cell, end
+    cell) on a `cells` x `cells` grid, with the offsets of every bucket.
+    Points without coordinates go to one extra cell, only read by queries
+    that don't restrict that end.
+    """
+
+    def __init__(self, df: pd.DataFrame, cells=10):
+        self.cells = cells
+        self._n = cells * cells + 1
+        events = pd.Categorical(df['Event'])
+        self._event_id = {e: i for i, e in enumerate(events.categories)}
+
+        self._xy = df[['X', 'Y', 'X2', 'Y2']].to_numpy(dtype=float)
+        start = self._point_cells(self._xy[:, 0], self._xy[:, 1])
+        end = self._point_cells(self._xy[:, 2], self._xy[:, 3])
+
+        codes = events.codes.astype(np.int64)
+        valid = codes >= 0
+        key = np.where(valid, (codes * self._n + start) * self._n + end, -1)
+        order = np.argsort(key, kind='stable')
+        self._order = order[np.count_nonzero(~valid):]
+        counts = np.bincount(key[valid],
+                             minlength=len(events.categories) * self._n ** 2)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def _axis_cells(self, v):
+        return np.clip((np.nan_to_num(v) * self.cells / 100).astype(np.int64),
+                       0, self.cells - 1)
+
+    def _point_cells(self, x, y):
+        cell = self._axis_cells(x) * self.cells + self._axis_cells(y)
+        return np.where(np.isnan(x) | np.isnan(y), self._n - 1, cell)
+
+    def _region_cells(self, region):
+        """Cells a region overlaps (every cell, and no-point, for None)."""
+        if region is None:
+            return np.arange(self._n)
+        x0, x1 = self._axis_cells(np.array([region.xmin, region.xmax]))
+        y0, y1 = self._axis_cells(np.array([region.ymin, region.ymax]))
+        xs, ys = np.arange(x0, x1 + 1), np.arange(y0, y1 + 1)
+        return (xs[:, None] * self.cells + ys[None, :]).ravel()
+
+    def positions(self, events, start=None, end=None):
+        """
+        Row positions in `df` (ascending) of `events` starting in region
+        `start` and ending in region `end` (None: anywhere).
+        """
+        events = [events] if isinstance(events, str) else list(events)
+        codes = np.array([self._event_id[e] for e in events
+                          if e in self._event_id], dtype=np.int64)
+        n = self._n
+        keys = ((codes[:, None, None] * n
+                 + self._region_cells(start)[None, :, None]) * n
+                + self._region_cells(end)[None, None, :]).ravel()
+
+        # Rows of all the buckets, without a loop over them
+        lo, hi = self._offsets[keys], self._offsets[keys + 1]
+        lengths = hi - lo
+        first = np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+        rows = self._order[first + np.arange(lengths.sum())]
+
+        xy = self._xy[rows]
+        keep = np.ones(len(rows), dtype=bool)
+        if start is not None:
+            keep &= start.contains(xy[:, 0], xy[:, 1])
+        if end is not None:
+            keep &= end.contains(xy[:, 2], xy[:, 3])
+        return np.sort(rows[keep])
@@ -0,0 +1,91 @@
+"""
+Player rosters: raw labels as logged ('54 Hurt') to the names the
+figures show ('54 Hurtado'), in the order they are drawn.
+
+    roster = Roster({'1': '1 Albarracin', '54 Hurt': '54 Hurtado'})
+    roster = Roster.from_lists(old_player_list, player_list)
+    df = roster.apply(df)
+    for message in roster.check(df).messages():
+        print(message)
+
+Player is categorical (footviz.events.load_events), so renaming only
+rewrites its category table, whatever the size of the frame. Two labels
+of the same player (a typo in part of the log) are merged into one
+category by remapping the codes.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+class RosterCheck(namedtuple('RosterCheck', ['unknown', 'unmapped'])):
+    """
+    unknown: labels in the data the roster doesn't map (kept as they are).
+    unmapped: roster labels that have no rows in the data.
+    """
+    __slots__ = ()
+
+    def messages(self):
+        messages = []
+        if self.unknown:
+            messages.append('NOT IN ROSTER (kept as logged): '
+                            + ', '.join(self.unknown))
+        if self.unmapped:
+            messages.append('ROSTER PLAYERS WITHOUT EVENTS: '
+                            + ', '.join(self.unmapped))
+        return messages
+
+
+class Roster:
+    """Raw label -> player name mapping (dict order is the figure order)."""
+
+    def __init__(self, mapping):
+        self.mapping = dict(mapping)
+        # Names in figure order, once even if several labels map to them
+        self.players = list(dict.fromkeys(self.mapping.values()))
+
+    @classmethod
+    def from_lists(cls, old_player_list, player_list):
+        """From the scripts' parallel lists, which must line up."""
+        if len(old_player_list) != len(player_list):
+            raise ValueError(f'{len(old_player_list)} raw labels for '
+                             f'{len(player_list)} player names')
+        duplicated = {p for p in old_player_list
+                      if old_player_list.count(p) > 1}
+        if duplicated:
+            raise ValueError(f'raw labels listed twice: {sorted(duplicated)}')
+        return cls(zip(old_player_list, player_list))
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def apply(self, df: pd.DataFrame, column='Player'):
+        """Copy of `df` with `column` (categorical) renamed."""
+        df = df.copy()
+        cat = df[column].astype('category').cat
+        names = [self.mapping.get(c, c) for c in cat.categories]
+        unique = list(dict.fromkeys(names))
+        if len(unique) == len(names):
+            df[column] = cat.rename_categories(names)
+        else:
+            # Merged labels: remap the codes onto the unique names
+            lookup = np.array([unique.index(n) for n in names] + [-1])
+            codes = lookup[cat.codes.to_numpy()]
+            df[column] = pd.Categorical.from_codes(codes, categories=unique)
+        return df
+
+    def check(self, df: pd.DataFrame, column='Player'):
+        """Labels of `df` (renamed or not) the roster doesn't account for."""
+        cat = df[column].astype('category').cat
+        codes = cat.codes.to_numpy()
+        # Only labels with rows (a filtered frame keeps every category)
+        counts = np.bincount(codes[codes >= 0],
+                             minlength=len(cat.categories))
+        present = set(cat.categories[counts > 0])
+        known = self.mapping.keys() | set(self.players)
+        return RosterCheck(
+            unknown=sorted(present - known),
+            unmapped=[raw for raw, name in self.mapping.items()
+                      if raw not in present and name not in present],
+        )
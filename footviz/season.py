@@ -0,0 +1,357 @@
+"""
+Per-match aggregates, and season rollups made by adding them up.
+
+    python -m footviz.season data/season -o out/season --team Home \\
+        --defenders "3 Loor" "2 Castro" "54 Hurt" --figure season.png
+
+Every <match>.csv in the folder gets an aggregate file in <out>/matches,
+computed once and reused while the CSV and the options stay the same, so
+adding a match only processes that match. A CSV is only hashed again when
+its size or modification time changed. Aggregates with the pass rows
+(made for --figure) also serve runs that don't need them. New or changed
+matches are loaded together (footviz.events.load_season, -j processes),
+or with --stream read in chunks one after the other (footviz.stream) for
+files too big to load. An aggregate holds:
+
+    passes         pass adjacency matrix (raw player names)
+    locations      sum of the Opta X, Y of every player's completed passes
+                   and their number n, so averages can be merged
+    zones          completed passes per zone (footviz.zones.ZONE_GRIDS)
+    final_third    passes into the final third per player (completed,
+                   failed)
+    events         the rows the profile panels draw as lines: passes and
+                   failed passes ending in the final third, every pass of
+                   the --defenders, shots and goals (with --stream and
+                   no --figure, only shots and goals)
+
+The season is the sum (counts, matrices) or concatenation (rows) of the
+aggregates. It is written as season_*.csv files (with the network's
+player metrics, footviz.metrics, in season_metrics.csv) and, with --figure,
+drawn as a team profile (footviz.shotmap_plot) through SeasonIndex.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from footviz.events import COORDS, SB_COORDS, atomic_write, file_hash, \
+    load_season, team_rows, to_statsbomb
+from footviz.index import EventIndex
+from footviz.instrument import stage, staged
+from footviz.metrics import network_metrics
+from footviz.network import pass_matrix, sort_for_pairing
+from footviz.regions import FINAL_THIRD_ZONE, OUTSIDE_FINAL_THIRD
+from footviz.zones import FINAL_THIRD, ZONE_GRIDS
+
+# Bump when the aggregates below change so old files are recomputed
+AGG_VERSION = 2
+
+EVENT_COLUMNS = ['Player', 'Event', 'Mins', 'Secs', *COORDS, *SB_COORDS]
+
+
+def _plain_index(df):
+    # Categorical indexes of different matches don't concatenate cleanly
+    df.index = df.index.astype(object)
+    return df
+
+
+@staged('match_aggregates')
+def match_aggregates(df: pd.DataFrame, match, players=()):
+    """
+    Aggregates of one match from its cleaned events (one team's rows, see
+    footviz.events.load_events). Every pass of `players` is kept as rows.
+    """
+    idx = EventIndex(df)
+
+    passes, misordered = pass_matrix(sort_for_pairing(df))
+
+    pdf = idx.get('Pass')
+    locations = pdf[['X', 'Y']].astype(float).groupby(
+        pdf['Player'], observed=True).agg(['sum', 'count'])
+    locations = pd.DataFrame({
+        'X': locations[('X', 'sum')],
+        'Y': locations[('Y', 'sum')],
+        'n': locations[('X', 'count')],
+    })
+
+    entries = {}
+    for event, column in [('Pass', 'completed'), ('Failed Pass', 'failed')]:
+        edf = idx.between(event, OUTSIDE_FINAL_THIRD, FINAL_THIRD_ZONE)
+        entries[column] = edf['Player'].value_counts()
+    final_third = pd.DataFrame(entries).fillna(0).astype(np.int64)
+    final_third = final_third[final_third.sum(axis=1) > 0]
+
+    event = df['Event']
+    keep = event.isin(['Shot', 'Goal']).to_numpy() \
+        | (event.isin(['Pass', 'Failed Pass'])
+           & ((df['X2'] >= FINAL_THIRD) | df['Player'].isin(players))
+           ).to_numpy()
+    events = df.loc[keep, EVENT_COLUMNS].assign(Match=match)
+
+    return {
+        'version': AGG_VERSION,
+        'match': match,
+        'passes': passes,
+        'misordered': misordered,
+        'total_passes': len(pdf),
+        'locations': _plain_index(locations),
+        'zones': {grid: idx.zone_counts(grid) for grid in ZONE_GRIDS},
+        'final_third': _plain_index(final_third),
+        'events': events.reset_index(drop=True),
+    }
+
+
+def save_aggregates(agg, path):
+    with atomic_write(path) as tmp:
+        pd.to_pickle(agg, tmp)
+
+
+def load_aggregates(path):
+    return pd.read_pickle(path)
+
+
+def _params(half_time, invert_first_half, team, players):
+    return {
+        'half_time': half_time,
+        'invert_first_half': invert_first_half,
+        'team': team,
+        'players': sorted(players),
+    }
+
+
+def _stat(path):
+    stat = path.stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _source(path):
+    """What the aggregates of `path` were made from (stat taken first)."""
+    return {**_stat(path), 'sha1': file_hash(path)}
+
+
+def _current(artifact, path, params, pass_rows):
+    """
+    Stored aggregates if they were made from the same file and options,
+    with the pass rows if `pass_rows`. The file is only hashed when its
+    size or modification time changed.
+    """
+    if not artifact.exists():
+        return None
+    agg = load_aggregates(artifact)
+    if agg.get('version') != AGG_VERSION or agg.get('params') != params \
+            or (pass_rows and not agg['pass_rows']):
+        return None
+
+    stat = _stat(path)
+    if all(agg['source'][k] == v for k, v in stat.items()):
+        return agg
+    if agg['source']['sha1'] != file_hash(path):
+        return None
+    # Same content (copied or touched): skip the hash next time
+    agg['source'].update(stat)
+    save_aggregates(agg, artifact)
+    return agg
+
+
+@staged('rollup')
+def rollup(aggs):
+    """
+    Season totals from match aggregates. 'network' has the format of
+    footviz.network.build_network (players in order of appearance).
+    """
+    aggs = list(aggs)
+    players = list(dict.fromkeys(p for agg in aggs
+                                 for p in agg['passes'].index))
+
+    counts = np.zeros((len(players), len(players)), dtype=np.int64)
+    for agg in aggs:
+        counts += agg['passes'].reindex(index=players, columns=players,
+                                        fill_value=0).to_numpy()
+    passes = pd.DataFrame(counts, index=players, columns=players)
+
+    sums = pd.concat([agg['locations'] for agg in aggs]) \
+        .groupby(level=0, sort=False).sum().reindex(players)
+    locations = pd.DataFrame({'X': sums['X'] / sums['n'],
+                              'Y': sums['Y'] / sums['n']})
+    locations['X_sb'], locations['Y_sb'] = to_statsbomb(locations['X'],
+                                                        locations['Y'])
+
+    final_third = pd.concat([agg['final_third'] for agg in aggs]) \
+        .groupby(level=0, sort=False).sum()
+
+    events = pd.concat([agg['events'] for agg in aggs], ignore_index=True)
+    # Categories differ between matches, so concat leaves plain objects
+    events = events.astype({'Player': 'category', 'Event': 'category',
+                            'Match': 'category'})
+
+    return {
+        'matches': [agg['match'] for agg in aggs],
+        'network': {
+            'passes': passes,
+            'misordered': sum(agg['misordered'] for agg in aggs),
+            'max_val': counts.max(initial=0),
+            'totals': passes.sum(axis=1),
+            'total_passes': sum(agg['total_passes'] for agg in aggs),
+            'locations': locations,
+        },
+        'zones': {grid: sum(agg['zones'][grid] for agg in aggs)
+                  for grid in ZONE_GRIDS},
+        'final_third': final_third,
+        'events': events,
+    }
+
+
+class SeasonIndex(EventIndex):
+    """
+    EventIndex over the rows kept in the aggregates of a season, with the
+    zone counts of the rollup, so the team profile panels can draw it.
+    Only the rows listed in the module docstring are there.
+    """
+
+    def __init__(self, season):
+        super().__init__(season['events'])
+        self.zones = season['zones']
+
+    def zone_counts(self, grid, events='Pass', players=None):
+        if events != 'Pass' or players is not None:
+            raise ValueError('aggregates only count completed passes '
+                             'of the whole team per zone')
+        return self.zones[grid]
+
+
+def update_season(paths, out_dir, half_time=60, invert_first_half=False,
+                  team=None, players=(), workers=None, stream=False,
+                  chunksize=100_000, pass_rows=True):
+    """
+    Aggregates of every CSV in `paths`. Only missing or outdated ones are
+    computed, from one concurrent load of their events (load_season), or
+    with stream=True one file after the other in chunks of `chunksize`
+    rows (footviz.stream). pass_rows=False keeps only shots and goals as
+    event rows (stored aggregates with the pass rows are still used).
+    """
+    paths = [Path(p) for p in paths]
+    out_dir = Path(out_dir)
+    pass_rows = pass_rows or not stream
+    params = _params(half_time, invert_first_half, team, players)
+    stored = {'params': params, 'pass_rows': pass_rows}
+    aggs, stale = {}, []
+    for path in paths:
+        agg = _current(out_dir / f'{path.stem}.agg.pkl', path, params,
+                       pass_rows)
+        if agg is None:
+            stale.append(path)
+        else:
+            print(f'{path.stem}: up to date')
+            aggs[path] = agg
+
+    if stale and stream:
+        from footviz.stream import stream_aggregates
+
+        for path in stale:
+            source = _source(path)
+            agg = {**stream_aggregates(path, path.stem, half_time,
+                                       invert_first_half, team, players,
+                                       chunksize, pass_rows),
+                   **stored, 'source': source}
+            save_aggregates(agg, out_dir / f'{path.stem}.agg.pkl')
+            print(f'{path.stem}: computed (streamed)')
+            aggs[path] = agg
+    elif stale:
+        sources = {path: _source(path) for path in stale}
+        events = load_season(stale, half_time, invert_first_half,
+                             workers=workers)
+        matches = dict(tuple(events.groupby('Match', observed=True)))
+        for path in stale:
+            df = matches[path.stem].drop(columns='Match')
+            # Same categories (and order) as loading the file alone
+            for col in df.select_dtypes('category'):
+                df[col] = df[col].cat.remove_unused_categories()
+            df = team_rows(df.reset_index(drop=True), team)
+            agg = {**match_aggregates(df, path.stem, players),
+                   **stored, 'source': sources[path]}
+            save_aggregates(agg, out_dir / f'{path.stem}.agg.pkl')
+            print(f'{path.stem}: computed')
+            aggs[path] = agg
+    return [aggs[path] for path in paths]
+
+
+def write_season(season, out_dir):
+    out_dir = Path(out_dir)
+    network = season['network']
+    network['passes'].to_csv(out_dir / 'season_adjacency.csv')
+    network_metrics(network['passes']).to_csv(out_dir / 'season_metrics.csv')
+    network['locations'].assign(passes=network['totals']) \
+        .to_csv(out_dir / 'season_locations.csv')
+    season['final_third'].to_csv(out_dir / 'season_final_third.csv')
+    events = season['events']
+    events[events['Event'].isin(['Shot', 'Goal'])] \
+        .to_csv(out_dir / 'season_shots.csv', index=False)
+    for grid, counts in season['zones'].items():
+        np.savetxt(out_dir / f'season_{grid}.csv', counts, fmt='%d',
+                   delimiter=',')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('events_dir', help='folder with <match>.csv files')
+    parser.add_argument('-o', '--out-dir', default='season')
+    parser.add_argument('--team', default=None,
+                        help='only rows of this team (default: all rows)')
+    parser.add_argument('--defenders', nargs='*', default=[],
+                        help='players whose passes are kept for the '
+                             'defenders panel')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help='processes parsing new match files')
+    parser.add_argument('--stream', action='store_true',
+                        help='read new match files in chunks, one at a time '
+                             '(low memory, footviz.stream)')
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help='rows per chunk with --stream')
+    parser.add_argument('--half-time', type=int, default=60)
+    parser.add_argument('--invert-first-half', action='store_true')
+    parser.add_argument('--figure', default=None,
+                        help='also draw the season team profile to this PNG')
+    parser.add_argument('--title', default='')
+    parser.add_argument('--dpi', type=int, default=250)
+    args = parser.parse_args(argv)
+
+    out_dir = Path(args.out_dir)
+    paths = sorted(Path(args.events_dir).glob('*.csv'))
+    aggs = update_season(paths, out_dir / 'matches',
+                         half_time=args.half_time,
+                         invert_first_half=args.invert_first_half,
+                         team=args.team,
+                         players=args.defenders,
+                         workers=args.workers,
+                         stream=args.stream,
+                         chunksize=args.chunksize,
+                         # Pass rows only matter for the figure
+                         pass_rows=bool(args.figure))
+    if not aggs:
+        print(f'No .csv files in {args.events_dir}')
+        return 1
+
+    season = rollup(aggs)
+    write_season(season, out_dir)
+    print(f'{len(aggs)} matches, season tables in {out_dir}')
+
+    if args.figure:
+        # Plotting stack only when drawing
+        import matplotlib
+        matplotlib.use('Agg')
+        from footviz.shotmap_plot import plot_team_profile, save
+
+        with stage('season_figure'):
+            fig = plot_team_profile(SeasonIndex(season), args.defenders,
+                                    title_text=args.title,
+                                    subtitle_text=f'{len(aggs)} partidos')
+            save(fig, args.figure, dpi=args.dpi)
+        print(f'Season profile: {args.figure}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Local render server: a pool of worker processes that keep matplotlib,
+mplsoccer, the font cache and the pitch backgrounds loaded, so a report
+costs its drawing time only, not the interpreter start and the imports.
+
+    python -m footviz.serve -j 4 --port 8765 --data-root data
+
+    curl -s localhost:8765/render -d @request.json -o report.png
+
+A request is a JSON object, the response the PNG bytes (errors: status
+400 for a bad request, 500 otherwise, with the message as text):
+
+    {
+        "report": "pass_network",           # or "shotmap"
+        "events": "20240119_events.csv",    # path under --data-root,
+        "events_csv": "Team,Player,...",    # or the CSV itself
+        "team": "Home",                     # only rows of this Team
+        "players": {"1": "1 Albarracin", "54 Hurt": "54 Hurtado"},
+        "title_text": "...", "subtitle_text": "...",
+        "logo": "20240119_logo.png",        # under --data-root too
+        "bg_color": "#faf9f4", "base_color": "#de9314",
+        "defenders": ["3 Loor", "2 Castro"],     # shotmap
+        "style": {"event2_marker_color1": "#B5B4B2"},   # shotmap
+        "heatmap_mode": "grid",             # pass_network
+        "half_time": 60, "invert_first_half": false,
+        "preview": false, "dpi": 250
+    }
+
+"players" maps raw to display names. The pass network draws them in
+that order (it is required there); the shotmap only renames, so
+"defenders" are display names when "players" is given. Paths are
+relative to --data-root (default: the current folder), and paths that
+lead outside it are rejected, so a request can only read (and cache next
+to) files under it. Requests are handled concurrently, each by a free
+worker. The server only listens on localhost.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+from footviz.events import DTYPES, clean_events, load_events, team_rows
+from footviz.index import EventIndex
+from footviz.instrument import stage
+from footviz.network import build_network, sort_for_pairing
+from footviz.roster import Roster
+from footviz.synthetic import sample_events
+
+REPORTS = ['pass_network', 'shotmap']
+
+# Request fields that are paths (under the data root)
+PATHS = ['events', 'logo']
+
+# Columns of an events export
+COLUMNS = [*DTYPES, 'X2', 'Y2']
+
+
+class BadRequest(ValueError):
+    """A request the server can't render (answered with status 400)."""
+
+
+def _warm():
+    """
+    Worker initializer: imports, fonts and pitches, by drawing a made-up
+    match (footviz.synthetic.sample_events) once.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+    events, info = sample_events()
+    request = {'events_csv': events.to_csv(index=False),
+               'half_time': info['half_time'],
+               'players': {p: p for p in info['players']},
+               'defenders': info['players'][:3],
+               'preview': True}
+    with stage('serve_warm'):
+        for report in REPORTS:
+            render_report({**request, 'report': report})
+
+
+def _events(request):
+    half_time = request.get('half_time', 60)
+    invert_first_half = request.get('invert_first_half', False)
+    try:
+        if 'events_csv' in request:
+            source = '"events_csv"'
+            data = pd.read_csv(io.StringIO(request['events_csv']))
+            _check_columns(data.columns, source)
+            df = clean_events(data, half_time, invert_first_half)
+        elif 'events' in request:
+            source = request['events']
+            _check_columns(pd.read_csv(source, nrows=0).columns, source)
+            df = load_events(source, half_time, invert_first_half)
+        else:
+            raise BadRequest('"events" (a path) or "events_csv" is required')
+    except BadRequest:
+        raise
+    except FileNotFoundError as e:
+        raise BadRequest(f'no events file {request["events"]}') from e
+    except (ValueError, TypeError) as e:
+        # Not a CSV, or values that aren't times and coordinates
+        raise BadRequest(f'{source} is not an events export: {e}') from e
+
+    return team_rows(df, request.get('team'))
+
+
+def _check_columns(columns, source):
+    missing = [c for c in COLUMNS if c not in columns]
+    if missing:
+        raise BadRequest(f'{source} has no {", ".join(missing)} column'
+                         + ('s' if len(missing) > 1 else '')
+                         + f' (expected {",".join(COLUMNS)})')
+
+
+def resolve_paths(request, data_root):
+    """Copy of `request` with its paths made absolute, under `data_root`."""
+    data_root = Path(data_root).resolve()
+    request = dict(request)
+    for key in PATHS:
+        if key not in request:
+            continue
+        if not isinstance(request[key], str):
+            raise BadRequest(f'"{key}" must be a path')
+        # resolve() also follows symlinks out of the root
+        path = (data_root / request[key]).resolve()
+        if not path.is_relative_to(data_root):
+            raise BadRequest(f'"{key}" must be a path under the data root')
+        request[key] = str(path)
+    return request
+
+
+def _pass_network(df, request):
+    from footviz.network_plot import BASE_COLOR, BG_COLOR, PREVIEW_DPI, \
+        plot_pass_network
+
+    players = request.get('players')
+    if not players:
+        raise BadRequest('"players" is required for the pass network')
+    roster = Roster(players)
+    df = roster.apply(sort_for_pairing(df))
+    net = build_network(df)
+    fig = plot_pass_network(df, net, roster.players,
+                            title_text=request.get('title_text', ''),
+                            subtitle_text=request.get('subtitle_text', ''),
+                            logo=request.get('logo'),
+                            bg_color=request.get('bg_color', BG_COLOR),
+                            base_color=request.get('base_color', BASE_COLOR),
+                            heatmap_mode=request.get('heatmap_mode', 'grid'),
+                            preview=request.get('preview', False))
+    return fig, PREVIEW_DPI
+
+
+def _shotmap(df, request):
+    from footviz.shotmap_plot import PREVIEW_DPI, plot_team_profile
+
+    players = request.get('players')
+    if players:
+        df = Roster(players).apply(df)
+    style = dict(request.get('style', {}))
+    if 'bg_color' in request:
+        style['bg_color'] = request['bg_color']
+    if 'base_color' in request:
+        style['event1_marker_color1'] = request['base_color']
+    style['preview'] = request.get('preview', False)
+    fig = plot_team_profile(EventIndex(df.reset_index(drop=True)),
+                            request.get('defenders', []),
+                            title_text=request.get('title_text', ''),
+                            subtitle_text=request.get('subtitle_text', ''),
+                            logo=request.get('logo'),
+                            style=style)
+    return fig, PREVIEW_DPI
+
+
+def render_report(request):
+    """PNG bytes of the report described by `request`. Runs in a worker."""
+    import matplotlib.pyplot as plt
+
+    report = request.get('report')
+    if report not in REPORTS:
+        raise BadRequest(f'"report" must be one of {REPORTS}')
+
+    with stage(f'serve.{report}'):
+        df = _events(request)
+        draw = _pass_network if report == 'pass_network' else _shotmap
+        fig, preview_dpi = draw(df, request)
+        dpi = request.get('dpi', preview_dpi if request.get('preview')
+                          else 250)
+        buf = io.BytesIO()
+        with stage('savefig'):
+            fig.savefig(buf, format='png', bbox_inches='tight', dpi=dpi)
+        plt.close(fig)
+    return buf.getvalue()
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    # Set by serve()
+    pool = None
+    data_root = Path('.')
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, b'ok', 'text/plain')
+        else:
+            self._reply(404, b'POST a report request to /render',
+                        'text/plain')
+
+    def do_POST(self):
+        if self.path != '/render':
+            self._reply(404, b'POST a report request to /render',
+                        'text/plain')
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise BadRequest('the request must be a JSON object')
+            request = resolve_paths(request, self.data_root)
+            png = self.pool.submit(render_report, request).result()
+        except (BadRequest, json.JSONDecodeError) as e:
+            self._reply(400, str(e).encode(), 'text/plain')
+        except Exception as e:
+            self._reply(500, repr(e).encode(), 'text/plain')
+        else:
+            self._reply(200, png, 'image/png')
+
+    def _reply(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(port=8765, workers=None, data_root='.'):
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm) as pool:
+        # Start (and warm) every worker before taking requests
+        for future in [pool.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+        RenderHandler.pool = pool
+        RenderHandler.data_root = Path(data_root).resolve()
+        server = ThreadingHTTPServer(('127.0.0.1', port), RenderHandler)
+        print(f'{workers} warm workers, serving on '
+              f'http://127.0.0.1:{server.server_port}/render, '
+              f'files under {RenderHandler.data_root}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help='render processes (concurrent requests)')
+    parser.add_argument('--data-root', default='.',
+                        help='folder request paths are relative to, and '
+                             'limited to (default: current folder)')
+    args = parser.parse_args(argv)
+    serve(args.port, args.workers, args.data_root)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,535 @@
+"""
+Team profile figure: passes into the final third, centre-back passes, pass
+zones, shots and passes within the final third.
+
+Every panel is a function of (ax, pitch, idx, style) so it can be drawn on
+the report figure directly or on its own (see footviz.compose). idx is an
+EventIndex of one match, or a footviz.season.SeasonIndex for a season.
+"""
+from pathlib import Path
+
+import numpy as np
+import matplotlib.pyplot as plt
+from mplsoccer import Pitch, VerticalPitch
+from matplotlib import patheffects
+from matplotlib.patches import FancyArrow
+
+from footviz.assets import ICONS_DIR, add_image
+from footviz.colors import custom_cmap
+from footviz.compose import Panel, draw_panels, prepare_axes
+from footviz.events import to_statsbomb
+from footviz.instrument import stage, staged
+from footviz.pitches import draw_pitch
+from footviz.regions import BOX, FINAL_THIRD_ZONE, OUTSIDE_FINAL_THIRD
+from footviz.zones import FINAL_THIRD, ZONE_GRIDS
+
+
+# Defaults for everything the script can tweak
+STYLE = {
+    'bg_color': '#faf9f4',
+    # Title
+    'x_title': 0.135,
+    'y_title': 0.81,
+    'spacing': 0.43,  # title to subtitle space
+    # Fig Titles
+    'fig_fontsize': 12,
+    # Events
+    'event1_marker_color1': '#de9314',
+    'event2_marker_color1': '#B5B4B2',
+    'event_marker_width': 12,
+    'event_marker_width2': 18,
+    'line_alpha_start': 0.05,
+    'line_alpha_end': 0.15,
+    # Draft render: plain lines instead of comets, boxes instead of logos
+    'preview': False,
+}
+
+# Resolution of draft renders
+PREVIEW_DPI = 60
+
+# Final third line on the StatsBomb pitches
+FINAL_THIRD_SB = float(to_statsbomb([FINAL_THIRD], [0])[0][0])
+
+
+def make_pitches():
+    pitch = VerticalPitch(
+        # axis=True,
+        # label=True,
+        # tick=True,
+        goal_type='box',
+        line_color='#03191E',
+        # line_alpha=0.5,
+        linewidth=1.6,
+    )
+
+    # Zoomed in pitch for Shots and Goals
+    shots_pitch = VerticalPitch(
+        goal_type='box',
+        line_color='#03191E',
+        linewidth=1.6,
+        pad_right=-10,
+        pad_left=-10,
+        pad_bottom=-75
+    )
+
+    # Horizontal Pitch for Pass Zones Figure
+    hor_pitch = Pitch(
+        # axis=True,
+        # label=True,
+        # tick=True,
+        goal_type='box',
+        line_color='#03191E',
+        # line_alpha=0.5,
+        linewidth=1.6,
+    )
+
+    # Pitch for final third passes
+    passes_box_pitch = VerticalPitch(
+        goal_type='box',
+        line_color='#03191E',
+        linewidth=1.6,
+        # pad_right=-5,
+        # pad_left=-5,
+        pad_bottom=-55
+    )
+
+    return {
+        'pitch': pitch,
+        'shots': shots_pitch,
+        'hor': hor_pitch,
+        'passes_box': passes_box_pitch,
+    }
+
+
+def create_figure(style=STYLE):
+    fig = plt.figure(layout='constrained', figsize=(9.5, 4))
+    fig.patch.set_facecolor(style['bg_color'])
+
+    ax_title = fig.add_axes([0, 1.05, 1, 0.2], anchor='SW', zorder=1)
+    ax_title.axis('off')
+    ax_annotate = fig.add_axes([0, -0.16, 1, 0.125], anchor='NW', zorder=1)
+    ax_annotate.axis('off')
+
+    subfigs = fig.subfigures(1, 3, wspace=0.07, width_ratios=[2, 1, 1])
+
+    axsLeft = subfigs[0].subplots(1, 2)
+    axsMiddle = subfigs[1].subplots(2, 1)
+    axsRight = subfigs[2].subplots(2, 1)
+
+    axs = {
+        'title': ax_title,
+        'annotate': ax_annotate,
+        'final_third': axsLeft[0],
+        'defenders': axsLeft[1],
+        'zones': axsMiddle[0],
+        'vertical_zones': axsMiddle[1],
+        'shots': axsRight[0],
+        'final_third_passes': axsRight[1],
+    }
+    return fig, axs
+
+
+def _comet(style):
+    """Line options: fading comets, or one flat line each in preview."""
+    if style['preview']:
+        return {'alpha': (style['line_alpha_start']
+                          + style['line_alpha_end']) / 2}
+    return {
+        'comet': True,
+        'transparent': True,
+        'alpha_start': style['line_alpha_start'],
+        'alpha_end': style['line_alpha_end'],
+    }
+
+
+def _pass_lines(ax, pitch, pdf, color, style, lw=3):
+    xstart, ystart = pdf['X_sb'], pdf['Y_sb']
+    xend, yend = pdf['X2_sb'], pdf['Y2_sb']
+
+    pitch.lines(
+        xstart=xstart, ystart=ystart, xend=xend, yend=yend,
+        ax=ax,
+        lw=lw,
+        color=color,
+        **_comet(style),
+    )
+
+    pitch.scatter(x=xend, y=yend,
+                  ax=ax,
+                  s=style['event_marker_width'],
+                  marker='o',
+                  facecolor=color,
+                  # facecolor='#ef4146',
+                  zorder=2,
+                  )
+
+
+def _final_third_line(ax):
+    ax.hlines(
+        y=FINAL_THIRD_SB,
+        xmin=-3,
+        xmax=83,
+        colors='black',
+        linestyles='dashed',
+        alpha=0.3,
+        clip_on=False,
+        zorder=-1,
+        in_layout=False,
+    )
+
+
+def _completed_failed(ax, completed, failed, style, xval=40, yval=-13):
+    ax.text(x=xval, y=yval,
+            s=f'{completed} Completados',
+            c=style['event1_marker_color1'],
+            ha='center',
+            weight='bold',
+            in_layout=False,
+            )
+
+    ax.text(x=xval, y=yval - 6,
+            s=f'{failed} Fallados',
+            c=style['event2_marker_color1'],
+            ha='center',
+            weight='bold',
+            in_layout=False,
+            )
+
+
+# ------------------------------------------------------------------- PANELS
+# Each panel draws its own pitch and content. Titles are part of the frame,
+# and what a panel draws outside its axes is kept out of the layout, so the
+# layout is the same whether panels are drawn here or in footviz.compose.
+
+def draw_final_third_entries(ax, pitch, idx, style=STYLE):
+    """Fig 1. Passes into Final Third"""
+    draw_pitch(pitch, ax)
+    ax.set_facecolor(style['bg_color'])
+
+    # Successful Passes
+    pdf = idx.between('Pass', OUTSIDE_FINAL_THIRD, FINAL_THIRD_ZONE)
+    # Unsuccessful Passes
+    fdf = idx.between('Failed Pass', OUTSIDE_FINAL_THIRD, FINAL_THIRD_ZONE)
+
+    # Add Data
+    _completed_failed(ax, len(pdf), len(fdf), style)
+
+    _pass_lines(ax, pitch, pdf, style['event1_marker_color1'], style)
+    _pass_lines(ax, pitch, fdf, style['event2_marker_color1'], style)
+
+    # Add Final 3rd Line
+    _final_third_line(ax)
+
+
+def draw_defender_passes(ax, pitch, idx, defenders, style=STYLE):
+    """Fig 2. Passes from Defenders"""
+    draw_pitch(pitch, ax)
+    ax.set_facecolor(style['bg_color'])
+
+    # Get defs total passes
+    def_total = idx.count(['Pass', 'Failed Pass'], defenders)
+
+    # Successful Passes
+    pdf = idx.get('Pass', defenders)
+    def_completed = len(pdf)
+
+    _completed_failed(ax, def_completed, def_total - def_completed, style)
+
+    _pass_lines(ax, pitch, pdf, style['event1_marker_color1'], style)
+    # Failed Passes
+    _pass_lines(ax, pitch, idx.get('Failed Pass', defenders),
+                style['event2_marker_color1'], style)
+
+
+def _zone_heatmap(ax, pitch, idx, grid, style):
+    # Passes per zone (summed over matches for a season)
+    counts = idx.zone_counts(grid)
+
+    # Zone layout from mplsoccer, share of passes from the counts
+    bin_statistic = pitch.bin_statistic([], [], statistic='count',
+                                        bins=ZONE_GRIDS[grid])
+    with np.errstate(invalid='ignore'):
+        bin_statistic['statistic'] = counts / counts.sum()
+
+    # Custom colormap from viz base color (cached)
+    # Original hand-picked colors: '#FFF1DB', '#FFE9CE', '#de9314', '#99610F'
+    ccmap = custom_cmap(style['event1_marker_color1'])
+
+    # Plot heatmap
+    pitch.heatmap(bin_statistic,
+                  ax=ax,
+                  cmap=ccmap,
+                  edgecolor='#03191E',
+                  )
+    # Path effects
+    path_eff = [patheffects.Stroke(linewidth=1.5, foreground='black'),
+                patheffects.Normal()]
+    # Add % labels
+    pitch.label_heatmap(bin_statistic,
+                        color='#f4edf0',
+                        fontsize=9,
+                        ax=ax,
+                        ha='center',
+                        va='center',
+                        str_format='{:.0%}',
+                        path_effects=path_eff,
+                        )
+
+
+def draw_zones(ax, pitch, idx, style=STYLE):
+    """Fig 3. Passes by Zones"""
+    draw_pitch(pitch, ax)
+    ax.set_facecolor(style['bg_color'])
+
+    _zone_heatmap(ax, pitch, idx, 'zones', style)
+
+    # Text for the arrow 'Dirección de Ataque' (arrow is part of the frame)
+    ax.text(x=60, y=96,
+            s='Dirección de Ataque',
+            ha='center',
+            in_layout=False,
+            )
+
+
+def draw_vertical_zones(ax, pitch, idx, style=STYLE):
+    """Fig 4. Passes by Vertical Zones"""
+    draw_pitch(pitch, ax)
+    ax.set_facecolor(style['bg_color'])
+
+    _zone_heatmap(ax, pitch, idx, 'vertical_zones', style)
+
+
+def draw_shots(ax, pitch, shots_pitch, idx, style=STYLE):
+    """Fig 5. Shots"""
+    draw_pitch(shots_pitch, ax)
+    # Add small border
+    ax.patch.set_edgecolor('black')
+    ax.patch.set_linewidth(0.3)
+    # Add bg color
+    ax.set_facecolor(style['bg_color'])
+
+    color = style['event1_marker_color1']
+
+    # Shots
+    pdf = idx.get('Shot')
+    tiros = len(pdf)
+    xstart, ystart = pdf['X_sb'], pdf['Y_sb']
+
+    pitch.scatter(x=xstart, y=ystart,
+                  ax=ax,
+                  s=style['event_marker_width2'],
+                  marker='o',
+                  edgecolor=color,
+                  facecolor=style['bg_color'],
+                  )
+
+    # Goals
+    pdf = idx.get('Goal')
+    goles = len(pdf)
+    tiros += goles
+
+    xstart, ystart = pdf['X_sb'], pdf['Y_sb']
+    xend, yend = pdf['X2_sb'], pdf['Y2_sb']
+
+    pitch.lines(
+        xstart=xstart, ystart=ystart, xend=xend, yend=yend,
+        ax=ax,
+        lw=2,
+        color=color,
+        **_comet(style),
+    )
+
+    pitch.scatter(x=xstart, y=ystart,
+                  ax=ax,
+                  s=style['event_marker_width2'],
+                  marker='o',
+                  facecolor=color,
+                  )
+
+    ax.text(
+        x=15, y=85,
+        s=f'{tiros} Tiros',
+        ha='left',
+        va='top',
+        color=color,
+        alpha=1,
+    )
+    ax.text(
+        x=15, y=80,
+        s=f'{goles} Goles',
+        ha='left',
+        va='top',
+        color=color,
+        weight='bold',
+    )
+
+
+def draw_final_third_passes(ax, pitch, box_pitch, idx, style=STYLE,
+                            failed=False):
+    """Fig 6. Passes within the Final Third"""
+    draw_pitch(box_pitch, ax)
+    # Add bg color
+    ax.set_facecolor(style['bg_color'])
+
+    _final_third_line(ax)
+
+    # Passes on Final 3rd
+    pdf = idx.between('Pass', FINAL_THIRD_ZONE, FINAL_THIRD_ZONE)
+
+    _pass_lines(ax, pitch, pdf, style['event1_marker_color1'], style)
+
+    if failed:
+        # Unsuccessful Passes into the box
+        pdf = idx.between('Failed Pass', end=BOX)
+        _pass_lines(ax, pitch, pdf, style['event2_marker_color1'], style)
+
+
+# -------------------------------------------------------------------- FRAME
+
+@staged('panel_titles')
+def draw_titles(fig, axs, style=STYLE):
+    fig_fontsize = style['fig_fontsize']
+    axs['final_third'].set_title('Pases al Último Tercio',
+                                 fontsize=fig_fontsize)
+    axs['defenders'].set_title('Pases de\nDefensas Centrales',
+                               fontsize=fig_fontsize)
+    axs['zones'].set_title('Pases por Zonas', fontsize=fig_fontsize)
+    axs['shots'].set_title('Tiros y Goles', fontsize=fig_fontsize)
+    axs['final_third_passes'].set_title('Pases en Último Tercio',
+                                        fontsize=fig_fontsize)
+
+    # Add arrow for 'Dirección de Ataque'
+    l1 = FancyArrow(x=0.51, y=0.49, dx=0.215, dy=0,
+                    transform=fig.transFigure, figure=fig,
+                    length_includes_head=True,
+                    head_length=0.01,
+                    head_width=0.0225)
+    fig.lines.extend([l1])
+
+
+@staged('title')
+def draw_title(fig, ax_title, title_text, subtitle_text, logo=None,
+               style=STYLE):
+    # Add team logo
+    if logo is not None:
+        add_image(fig, [0.021, 1.04, 0.19, 0.19], logo, style['preview'],
+                  anchor='W', zorder=1)
+
+    ax_title.text(
+        x=style['x_title'],
+        y=style['y_title'],
+        s=title_text,
+        size=20,
+        ha='left',
+        va='top',
+        # weight='bold',
+    )
+
+    # Add subtitle 1
+    ax_title.text(
+        x=style['x_title'],
+        y=style['y_title'] - style['spacing'],
+        s=subtitle_text,
+        size=13,
+        ha='left',
+        va='top',
+        # fontproperties=font_bold.prop,
+        color="#030303",
+        alpha=0.6,
+    )
+
+
+@staged('credits')
+def draw_credits(fig, ax_annotate, icons_dir=ICONS_DIR, style=STYLE):
+    # Twitter Account
+    ax_annotate.text(
+        x=1,
+        y=-0.1,
+        s='@DGCFutbol',
+        va='bottom',
+        ha='right',
+        fontsize=13,
+        weight='bold',
+        # ontproperties=robotto_regular.prop,
+        # color='#941C2F',
+        color=style['event1_marker_color1'],
+        # color='#0b4393',
+        alpha=1,
+    )
+
+    # Source label
+    ax_annotate.text(
+        1,
+        .45,
+        'Datos y Gráficos: Daniel Granja C.',
+        va='bottom',
+        ha='right',
+        fontsize=12,
+        # weight='bold',
+        # ontproperties=robotto_regular.prop,
+        color='#030303',
+        alpha=0.7,
+    )
+
+    # Add Social Media logo
+    if icons_dir is None:
+        return
+
+    y = -0.175
+    x = 0.84
+    add_image(fig, [x, y, 0.045, 0.045], Path(icons_dir) / 'tw.png',
+              style['preview'], anchor='SW', zorder=0)
+
+    add_image(fig, [x - 0.03, y - 0.012, 0.07, 0.07],
+              Path(icons_dir) / 'ig.png', style['preview'],
+              anchor='SW', zorder=0)
+
+
+@staged('frame')
+def build_team_profile(idx, defenders, title_text='', subtitle_text='',
+                       logo=None, icons_dir=ICONS_DIR, style=STYLE):
+    """
+    Figure with its frame (titles, arrow, logo, credits) and the list of
+    panels still to draw on it.
+    """
+    style = {**STYLE, **style}
+    pitches = make_pitches()
+    fig, axs = create_figure(style)
+
+    pitch = pitches['pitch']
+    panels = [
+        Panel(axs['final_third'], pitch,
+              draw_final_third_entries, (pitch, idx, style)),
+        Panel(axs['defenders'], pitch,
+              draw_defender_passes, (pitch, idx, defenders, style)),
+        Panel(axs['zones'], pitches['hor'],
+              draw_zones, (pitches['hor'], idx, style)),
+        Panel(axs['vertical_zones'], pitches['hor'],
+              draw_vertical_zones, (pitches['hor'], idx, style)),
+        Panel(axs['shots'], pitches['shots'],
+              draw_shots, (pitch, pitches['shots'], idx, style)),
+        Panel(axs['final_third_passes'], pitches['passes_box'],
+              draw_final_third_passes,
+              (pitch, pitches['passes_box'], idx, style)),
+    ]
+    for panel in panels:
+        prepare_axes(panel.pitch, panel.ax)
+
+    draw_titles(fig, axs, style)
+    draw_title(fig, axs['title'], title_text, subtitle_text, logo, style)
+    draw_credits(fig, axs['annotate'], icons_dir, style)
+    return fig, panels
+
+
+def plot_team_profile(idx, defenders, title_text='', subtitle_text='',
+                      logo=None, icons_dir=ICONS_DIR, style=STYLE):
+    """Draw the whole report and return the figure (not saved)."""
+    fig, panels = build_team_profile(idx, defenders, title_text,
+                                     subtitle_text, logo, icons_dir, style)
+    draw_panels(panels)
+    return fig
+
+
+def save(fig, path, dpi=250):
+    with stage('savefig'):
+        fig.savefig(path, bbox_inches='tight', dpi=dpi)
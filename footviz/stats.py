@@ -0,0 +1,81 @@
+"""
+The numbers the figures show, computed and printed without the plotting
+stack (matplotlib, mplsoccer), so a stats-only run starts in a fraction
+of the time of a render:
+
+    idx = EventIndex(df)
+    print_stats(team_profile_stats(idx, defenders))
+    print_stats(network_stats(build_network(df)))
+"""
+import numpy as np
+
+from footviz.regions import BOX, FINAL_THIRD_ZONE, OUTSIDE_FINAL_THIRD
+from footviz.zones import ZONE_GRIDS
+
+
+def _shares(counts):
+    with np.errstate(invalid='ignore'):
+        return counts / counts.sum()
+
+
+def team_profile_stats(idx, defenders):
+    """Numbers of the team profile panels (footviz.shotmap_plot)."""
+    def_total = idx.count(['Pass', 'Failed Pass'], defenders)
+    def_completed = idx.count('Pass', defenders)
+    return {
+        'final_third_entries': {
+            'completed': len(idx.between('Pass', OUTSIDE_FINAL_THIRD,
+                                         FINAL_THIRD_ZONE)),
+            'failed': len(idx.between('Failed Pass', OUTSIDE_FINAL_THIRD,
+                                      FINAL_THIRD_ZONE)),
+        },
+        'defender_passes': {
+            'completed': def_completed,
+            'failed': def_total - def_completed,
+        },
+        # Share of completed passes, top row first like the heatmaps
+        **{grid: _shares(idx.zone_counts(grid)) for grid in ZONE_GRIDS},
+        'final_third_passes': len(idx.between('Pass', FINAL_THIRD_ZONE,
+                                              FINAL_THIRD_ZONE)),
+        'failed_passes_into_box': len(idx.between('Failed Pass', end=BOX)),
+        'shots': idx.count(['Shot', 'Goal']),
+        'goals': idx.count('Goal'),
+    }
+
+
+def network_stats(net, top=5):
+    """Numbers of a pass network (footviz.network.build_network)."""
+    passes = net['passes']
+    upper = np.triu(passes.to_numpy(), k=1)
+    order = np.argsort(upper, axis=None, kind='stable')[::-1][:top]
+    rows, cols = np.unravel_index(order, upper.shape)
+    return {
+        'total_passes': net['total_passes'],
+        'misordered': net['misordered'],
+        'passes_per_player': net['totals'].sort_values(ascending=False),
+        'top_combinations': [(passes.index[i], passes.columns[j],
+                              int(upper[i, j]))
+                             for i, j in zip(rows, cols) if upper[i, j]],
+    }
+
+
+def print_stats(stats):
+    for name, value in stats.items():
+        label = name.replace('_', ' ')
+        if isinstance(value, dict):
+            print(f'{label}: ' + ', '.join(f'{k} {v}'
+                                           for k, v in value.items()))
+        elif isinstance(value, np.ndarray):
+            print(f'{label} (% of completed passes, attacking right):')
+            for row in value:
+                print('    ' + ' '.join(f'{v:4.0%}' for v in row))
+        elif isinstance(value, list):
+            print(f'{label}:')
+            for *players, n in value:
+                print(f'    {" - ".join(players)}: {n}')
+        elif hasattr(value, 'items'):
+            print(f'{label}:')
+            for k, v in value.items():
+                print(f'    {k}: {v}')
+        else:
+            print(f'{label}: {value}')
@@ -0,0 +1,253 @@
+"""
+Match aggregates (footviz.season) of event files too big to load, read in
+chunks with compact dtypes:
+
+    agg = stream_aggregates('archive/x1000.csv', team='Home')
+    python -m footviz.season archive -o out --stream
+
+Every chunk is cleaned like footviz.events.clean_events and folded into
+running totals; no full table is ever built. Counts that don't depend on
+row order (locations, zone bins, final third entries, completed passes)
+are simply added up.
+
+Pass pairing does depend on the order: each 'Pass Received' is paired
+with the row before it once the match is sorted by time and event type
+(footviz.network.sort_for_pairing). That row is the last one of the
+previous (second, event type) group, so all that is kept per group is
+its number of rows and its first and last player. Rows logged late,
+even by an hour, land in their group like any other. The result equals
+pass_matrix on the whole sorted file.
+
+Memory is one chunk plus about 24 bytes per (second, event type) group.
+With a file per match that is bounded by the length of a match. The
+event rows kept for the profile panels grow with the file, so only
+shots and goals are kept unless pass_rows=True.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from footviz.events import clean_events, team_rows
+from footviz.instrument import stage, staged
+from footviz.network import EVENT_ORDER
+from footviz.regions import FINAL_THIRD_ZONE, OUTSIDE_FINAL_THIRD
+from footviz.season import AGG_VERSION, EVENT_COLUMNS
+from footviz.zones import FINAL_THIRD, ZONE_GRIDS, zone_stats
+
+# Read types: parsed straight into their final compact dtypes
+READ_DTYPES = {
+    'Team': 'category',
+    'Player': 'category',
+    'Event': 'category',
+    'Mins': np.int16,
+    'Secs': np.int16,
+    'X': np.float32,
+    'Y': np.float32,
+    'X2': np.float32,
+    'Y2': np.float32,
+}
+
+# Rank of every event type when sorting for pairing; others go last
+_RANK = {e: i for i, e in enumerate(EVENT_ORDER)}
+_RANKS = len(EVENT_ORDER) + 1
+_PASS_RANKS = [_RANK['Pass'], _RANK['Assist']]
+_RECEIVED = _RANK['Pass Received']
+
+
+class _Labels:
+    """Growing label -> code table shared by all chunks."""
+
+    def __init__(self):
+        self.code = {}
+
+    def codes(self, col):
+        cat = col.cat
+        lookup = np.array([self.code.setdefault(c, len(self.code))
+                           for c in cat.categories] + [-1], dtype=np.int64)
+        return lookup[cat.codes.to_numpy()]
+
+    def sorted(self):
+        """Labels sorted (as astype('category') orders them) and the
+        old code -> sorted position table."""
+        labels = sorted(self.code)
+        order = np.empty(len(labels) + 1, dtype=np.int64)
+        order[-1] = -1
+        order[[self.code[label] for label in labels]] = np.arange(len(labels))
+        return labels, order
+
+
+class _Groups:
+    """
+    Rows per (second, event rank) group, in key order: number of rows and
+    first and last player (by arrival).
+    """
+
+    def __init__(self):
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.first = np.zeros(0, dtype=np.int32)
+        self.last = np.zeros(0, dtype=np.int32)
+
+    def add(self, keys, players):
+        """Rows of one chunk, in arrival order."""
+        if not len(keys):
+            return
+        # Stable: arrival order kept inside every group, and groups
+        # already stored (earlier rows) come before the chunk's
+        keys = np.concatenate([self.keys, keys])
+        counts = np.concatenate([self.counts, np.ones(len(players),
+                                                      dtype=np.int64)])
+        first = np.concatenate([self.first, players])
+        last = np.concatenate([self.last, players])
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)] - 1
+        self.keys = keys[starts]
+        self.counts = np.add.reduceat(counts[order], starts)
+        self.first = first[order][starts]
+        self.last = last[order][ends]
+
+    def pairs(self):
+        """(passer, receiver) codes of the paired passes, and misordered."""
+        rank = self.keys % _RANKS
+        received = np.flatnonzero(rank == _RECEIVED)
+        # Row before a group's first row: last row of the previous group
+        before = received - 1
+        paired = before >= 0
+        paired[paired] = np.isin(rank[before[paired]], _PASS_RANKS)
+
+        # Only the first 'Pass Received' of a group can follow a pass
+        misordered = int(self.counts[received].sum() - paired.sum())
+        return (self.last[before[paired]], self.first[received[paired]],
+                misordered)
+
+
+@staged('stream_aggregates')
+def stream_aggregates(path, match=None, half_time=60,
+                      invert_first_half=False, team=None, players=(),
+                      chunksize=100_000, pass_rows=False):
+    """
+    Aggregates of the events CSV at `path`, as footviz.season
+    match_aggregates(team_rows(load_events(path), team)), read `chunksize`
+    rows at a time. Without pass_rows, 'events' only has shots and goals.
+    """
+    match = Path(path).stem if match is None else match
+    labels, events = _Labels(), set()
+    groups = _Groups()
+    total_passes = 0
+    loc_sums = {}
+    zones = {grid: 0 for grid in ZONE_GRIDS}
+    entries = {'completed': {}, 'failed': {}}
+    kept = []
+
+    reader = pd.read_csv(path, dtype=READ_DTYPES, na_values={'X2': ['-'],
+                                                             'Y2': ['-']},
+                         chunksize=chunksize)
+    for chunk in reader:
+        with stage('stream_chunk'):
+            # Only players with rows of `team` get a code
+            df = team_rows(clean_events(chunk, half_time, invert_first_half),
+                           team)
+            player = labels.codes(df['Player']).astype(np.int32)
+            events.update(df['Event'].cat.categories)
+            event = df['Event'].astype(object)
+
+            # Pairing groups: (Mins, Secs, event rank)
+            rank = event.map(_RANK).fillna(_RANKS - 1).to_numpy(np.int64)
+            second = df['Mins'].to_numpy(np.int64) * 65536 \
+                + df['Secs'].to_numpy(np.int64)
+            groups.add(second * _RANKS + rank, player)
+
+            # Order independent counts
+            is_pass = (event == 'Pass').to_numpy()
+            total_passes += int(is_pass.sum())
+            own = is_pass & (player >= 0)
+            n = len(labels.code)
+            sums = np.stack([
+                np.bincount(player[own], weights=df['X'].to_numpy(float)[own],
+                            minlength=n),
+                np.bincount(player[own], weights=df['Y'].to_numpy(float)[own],
+                            minlength=n),
+                np.bincount(player[own], minlength=n),
+            ], axis=1)
+            for code in np.flatnonzero(sums[:, 2]):
+                loc_sums[code] = loc_sums.get(code, 0) + sums[code]
+
+            stats = zone_stats(df['X_sb'].to_numpy()[is_pass],
+                               df['Y_sb'].to_numpy()[is_pass])
+            for grid in ZONE_GRIDS:
+                zones[grid] = zones[grid] + stats[grid]
+
+            x, y = df['X'].to_numpy(), df['Y'].to_numpy()
+            x2, y2 = df['X2'].to_numpy(), df['Y2'].to_numpy()
+            into = OUTSIDE_FINAL_THIRD.contains(x, y) \
+                & FINAL_THIRD_ZONE.contains(x2, y2)
+            for name, column in [('Pass', 'completed'),
+                                 ('Failed Pass', 'failed')]:
+                rows = player[into & (event == name).to_numpy()]
+                for code, count in zip(*np.unique(rows[rows >= 0],
+                                                  return_counts=True)):
+                    entries[column][code] = \
+                        entries[column].get(code, 0) + int(count)
+
+            keep = event.isin(['Shot', 'Goal']).to_numpy()
+            if pass_rows:
+                keep |= (event.isin(['Pass', 'Failed Pass'])
+                         & ((df['X2'] >= FINAL_THIRD)
+                            | df['Player'].isin(players))).to_numpy()
+            rows = df.loc[keep, EVENT_COLUMNS]
+            kept.append(rows.astype({'Player': object, 'Event': object}))
+
+    return _finish(match, labels, sorted(events), groups, total_passes,
+                   loc_sums, zones, entries, kept)
+
+
+def _finish(match, labels, events, groups, total_passes, loc_sums, zones,
+            entries, kept):
+    names, order = labels.sorted()
+    n = len(names)
+
+    passer, receiver, misordered = groups.pairs()
+    passer, receiver = order[passer], order[receiver]
+    keep = (passer >= 0) & (receiver >= 0) & (passer != receiver)
+    counts = np.bincount(passer[keep] * n + receiver[keep],
+                         minlength=n * n).reshape(n, n)
+    counts = counts + counts.T
+    passes = pd.DataFrame(counts, index=names, columns=names)
+
+    located = sorted(loc_sums, key=lambda code: order[code])
+    locations = pd.DataFrame(
+        [loc_sums[code] for code in located], columns=['X', 'Y', 'n'],
+        index=pd.Index([names[order[c]] for c in located], dtype=object,
+                       name='Player'))
+    locations['n'] = locations['n'].astype(np.int64)
+
+    final_third = pd.DataFrame(
+        {column: pd.Series({names[order[c]]: v for c, v in found.items()},
+                           dtype=np.int64)
+         for column, found in entries.items()}).fillna(0).astype(np.int64)
+    final_third = final_third.reindex(sorted(final_third.index))
+    final_third.index = final_third.index.astype(object).rename('Player')
+
+    rows = pd.concat(kept, ignore_index=True) if kept else \
+        pd.DataFrame(columns=EVENT_COLUMNS)
+    # Same order as the sorted whole file (stable: arrival within a second)
+    rows = rows.sort_values(['Mins', 'Secs'], kind='stable')
+    rows = rows.astype({'Player': pd.CategoricalDtype(names),
+                        'Event': pd.CategoricalDtype(events)})
+    rows = rows.assign(Match=match).reset_index(drop=True)
+
+    return {
+        'version': AGG_VERSION,
+        'match': match,
+        'passes': passes,
+        'misordered': misordered,
+        'total_passes': total_passes,
+        'locations': locations,
+        'zones': zones,
+        'final_third': final_third,
+        'events': rows,
+    }
@@ -0,0 +1,154 @@
+"""
+Synthetic event files in the Team,Player,Event,Mins,Secs,X,Y,X2,Y2 format,
+`scale` times the size of a real match, for benchmarks.
+
+    info = generate('bench/x100.csv', scale=100)
+    load_events('bench/x100.csv', half_time=info['half_time'])
+
+    df, info = sample_events()      # a small match, in memory
+
+Players, event mix and size come from a template file (sample_events
+makes them up instead). Possessions are
+chains of 'Pass' + 'Pass Received' rows (same second, like the logged
+data) ending in a failed pass, a shot or an assisted goal. Every pass gets
+its own second so the rows can be paired after sorting, which means a big
+file is one very long (and busy) match: half time is moved to its middle
+minute and the second half is written flipped, as in the real files.
+Minutes must fit the int16 column of footviz.events, about 1400x a match.
+"""
+import csv
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TEMPLATE = Path(__file__).resolve().parent.parent \
+    / '20240124_LaConcordiaRed' / 'data' / '20240119_events.csv'
+
+HEADER = ['Team', 'Player', 'Event', 'Mins', 'Secs', 'X', 'Y', 'X2', 'Y2']
+
+
+def template_stats(path=TEMPLATE):
+    df = pd.read_csv(path)
+    counts = df['Event'].value_counts()
+    passes = counts.get('Pass', 0)
+    ends = counts.get('Failed Pass', 0) + counts.get('Shot', 0) \
+        + counts.get('Goal', 0)
+    # Passers weighted by how much they pass
+    passers = df.loc[df['Event'] == 'Pass', 'Player'].value_counts()
+    return {
+        'rows': len(df),
+        'team': df['Team'].mode()[0],
+        'players': passers.index.tolist(),
+        'weights': (passers / passers.sum()).to_numpy(),
+        'passes_per_possession': passes / max(ends, 1),
+        'p_failed': counts.get('Failed Pass', 0) / max(ends, 1),
+        'p_goal': counts.get('Goal', 0) / max(counts.get('Shot', 0)
+                                             + counts.get('Goal', 0), 1),
+    }
+
+
+def _possession(rng, stats, t):
+    """Rows of one possession starting at second `t`, attacking to X=100."""
+    players, weights = stats['players'], stats['weights']
+    rows = []
+    x, y = rng.uniform(10, 60), rng.uniform(5, 95)
+    player = rng.choice(len(players), p=weights)
+
+    n = rng.geometric(1 / (1 + stats['passes_per_possession'])) - 1
+    for _ in range(n):
+        receiver = rng.choice(len(players), p=weights)
+        while receiver == player:
+            receiver = rng.choice(len(players), p=weights)
+        x2 = np.clip(x + rng.normal(6, 15), 0, 100)
+        y2 = np.clip(y + rng.normal(0, 20), 0, 100)
+        rows.append((players[player], 'Pass', t, x, y, x2, y2))
+        rows.append((players[receiver], 'Pass Received', t, x2, y2,
+                     None, None))
+        player, x, y = receiver, x2, y2
+        t += int(rng.integers(1, 4))
+
+    end = rng.random()
+    if end < stats['p_failed']:
+        x2 = np.clip(x + rng.normal(15, 20), 0, 100)
+        y2 = np.clip(y + rng.normal(0, 25), 0, 100)
+        rows.append((players[player], 'Failed Pass', t, x, y, x2, y2))
+    else:
+        # Shot from inside or around the box
+        sx, sy = rng.uniform(80, 99), rng.uniform(25, 75)
+        gy = rng.uniform(40, 60)
+        if rng.random() < stats['p_goal']:
+            shooter = rng.choice(len(players), p=weights)
+            while shooter == player:
+                shooter = rng.choice(len(players), p=weights)
+            rows.append((players[player], 'Assist', t, x, y, sx, sy))
+            rows.append((players[shooter], 'Goal', t, sx, sy, 100, gy))
+        else:
+            rows.append((players[player], 'Shot', t, sx, sy, 100, gy))
+    return rows, t
+
+
+def _rows(stats, target, rng):
+    """Possession rows until there are `target`, and the half time minute."""
+    # Start a few minutes in, like a real match
+    t, rows = 300, []
+    while len(rows) < target:
+        possession, t = _possession(rng, stats, t)
+        rows.extend(possession)
+        t += int(rng.integers(3, 16))
+
+    # No rows in the half time minute; the second half attacks to X=0
+    half_time = (rows[-1][2] // 60) // 2 + 1
+    if rows[-1][2] // 60 + 1 > np.iinfo(np.int16).max:
+        raise ValueError(f'{target} rows do not fit in int16 minutes')
+    return rows, half_time
+
+
+def _records(rows, half_time, team):
+    """Rows in the CSV format, second half flipped."""
+    for player, event, t, x, y, x2, y2 in rows:
+        mins, secs = divmod(t, 60)
+        if mins >= half_time:
+            mins += 1
+            x, y = 100 - x, 100 - y
+            if x2 is not None:
+                x2, y2 = 100 - x2, 100 - y2
+        coords = [round(v) if v is not None else '-'
+                  for v in (x, y, x2, y2)]
+        yield [team, player, event, mins, secs, *coords]
+
+
+def generate(path, scale=1, template=TEMPLATE, seed=0):
+    """
+    Write about `scale` times the rows of `template` to `path` and return
+    {'path', 'rows', 'half_time', 'players'} (players in passing order).
+    """
+    stats = template_stats(template)
+    rng = np.random.default_rng(seed)
+    rows, half_time = _rows(stats, int(stats['rows'] * scale), rng)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(_records(rows, half_time, stats['team']))
+
+    return {'path': path, 'rows': len(rows), 'half_time': half_time,
+            'players': stats['players']}
+
+
+def sample_events(rows=800, players=11, seed=0):
+    """
+    A made-up match of about `rows` rows as a raw events table (the CSV
+    columns, '-' for missing ends), built in memory without a template,
+    and {'rows', 'half_time', 'players'}.
+    """
+    names = [f'{i} Player' for i in range(1, players + 1)]
+    stats = {'team': 'Home', 'players': names,
+             'weights': np.full(players, 1 / players),
+             'passes_per_possession': 4.0, 'p_failed': 0.4, 'p_goal': 0.2}
+    rows, half_time = _rows(stats, rows, np.random.default_rng(seed))
+    df = pd.DataFrame(_records(rows, half_time, stats['team']),
+                      columns=HEADER)
+    return df, {'rows': len(df), 'half_time': half_time, 'players': names}
@@ -0,0 +1,132 @@
+"""
+Pass networks of time windows ("minutes 0-30 vs 30-60 vs after the
+substitutions") from prefix sums over match minutes:
+
+    timeline = NetworkTimeline(df)            # sorted, renamed events
+    net = timeline.network(0, 30)             # like build_network
+    nets = timeline.networks([(0, 30), (30, 60), (60, 95)])
+
+The pass count matrix, the pass location sums and the totals are
+accumulated minute by minute once. The network of minutes [start, end)
+is then prefix[end] - prefix[start], so any number of windows (or every
+step of a sliding window animation) costs nothing per event.
+
+A pass belongs to the minute of its 'Pass Received' row.
+"""
+import numpy as np
+import pandas as pd
+
+from footviz.events import to_statsbomb
+from footviz.instrument import staged
+from footviz.network import PASS_EVENTS, player_index
+
+
+class NetworkTimeline:
+    """
+    Cumulative networks of `df` (sorted with sort_for_pairing, players
+    renamed) by match minute. Prefix m holds minutes 0 to m - 1.
+    """
+
+    @staged('network_timeline')
+    def __init__(self, df: pd.DataFrame, players=None):
+        if players is None:
+            players = player_index(df)
+        self.df = df
+        self.players = list(players)
+        n = len(self.players)
+        mins = df['Mins'].to_numpy().astype(np.int64)
+        self._mins = mins
+        self.minutes = int(mins.max(initial=-1)) + 1
+        m = self.minutes
+
+        event = df['Event']
+        codes = pd.Categorical(df['Player'], categories=self.players).codes
+        codes = codes.astype(np.int64)
+
+        # Pairs as in footviz.network.pass_matrix
+        received = (event == 'Pass Received').to_numpy()
+        after_pass = np.zeros(len(df), dtype=bool)
+        after_pass[1:] = event.isin(PASS_EVENTS).to_numpy()[:-1]
+        paired = received & after_pass
+        misordered = received & ~after_pass
+
+        passer = np.full_like(codes, -1)
+        passer[1:] = codes[:-1]
+        keep = paired & (passer >= 0) & (codes >= 0) & (passer != codes)
+        key = (mins[keep] * n + passer[keep]) * n + codes[keep]
+        counts = np.bincount(key, minlength=m * n * n).reshape(m, n, n)
+        counts = counts + counts.transpose(0, 2, 1)
+        self._passes = self._prefix(counts)
+
+        # Completed passes: location sums and number per player and minute
+        is_pass = (event == 'Pass').to_numpy()
+        own = is_pass & (codes >= 0)
+        key = mins[own] * n + codes[own]
+        xy = df[['X', 'Y']].to_numpy(dtype=float)[own]
+        sums = np.stack([
+            np.bincount(key, weights=xy[:, 0], minlength=m * n),
+            np.bincount(key, weights=xy[:, 1], minlength=m * n),
+            np.bincount(key, minlength=m * n),
+        ], axis=-1).reshape(m, n, 3)
+        self._locations = self._prefix(sums)
+
+        self._total_passes = self._prefix(
+            np.bincount(mins[is_pass], minlength=m))
+        self._misordered = self._prefix(
+            np.bincount(mins[misordered], minlength=m))
+
+    @staticmethod
+    def _prefix(per_minute):
+        """Cumulative sums along minutes, with a leading zero prefix."""
+        zero = np.zeros((1, *per_minute.shape[1:]), dtype=per_minute.dtype)
+        return np.concatenate([zero, np.cumsum(per_minute, axis=0)])
+
+    def _bounds(self, windows):
+        bounds = np.clip(np.asarray(windows, dtype=np.int64).reshape(-1, 2),
+                         0, self.minutes)
+        return bounds[:, 0], np.maximum(bounds[:, 0], bounds[:, 1])
+
+    def networks(self, windows):
+        """
+        Networks of every (start, end) window of minutes, end excluded,
+        each in the format of footviz.network.build_network.
+        """
+        start, end = self._bounds(windows)
+        # Every window at once: one difference of prefixes each
+        passes = self._passes[end] - self._passes[start]
+        sums = self._locations[end] - self._locations[start]
+        total = self._total_passes[end] - self._total_passes[start]
+        misordered = self._misordered[end] - self._misordered[start]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x = sums[..., 0] / sums[..., 2]
+            y = sums[..., 1] / sums[..., 2]
+        x_sb, y_sb = to_statsbomb(x, y)
+
+        nets = []
+        for w in range(len(start)):
+            matrix = pd.DataFrame(passes[w], index=self.players,
+                                  columns=self.players)
+            locations = pd.DataFrame({'X': x[w], 'Y': y[w], 'X_sb': x_sb[w],
+                                      'Y_sb': y_sb[w]}, index=self.players)
+            locations.index.name = 'Player'
+            nets.append({
+                'passes': matrix,
+                'misordered': int(misordered[w]),
+                'max_val': passes[w].max(initial=0),
+                'totals': matrix.sum(axis=1),
+                'total_passes': int(total[w]),
+                'locations': locations,
+            })
+        return nets
+
+    def network(self, start=0, end=None):
+        """Network of minutes [start, end) (end None: to the last)."""
+        end = self.minutes if end is None else end
+        return self.networks([(start, end)])[0]
+
+    def rows(self, start=0, end=None):
+        """Rows of `df` in minutes [start, end), e.g. for the heatmaps."""
+        end = self.minutes if end is None else end
+        lo, hi = np.searchsorted(self._mins, [start, end])
+        return self.df.iloc[lo:hi]
@@ -0,0 +1,100 @@
+"""
+Pitch zones of the team profile in StatsBomb units (120x80), and event
+counts per zone in the layout of mplsoccer's bin_statistic, so counts
+can be stored, summed over matches and drawn with pitch.heatmap.
+
+zone_stats bins the points for every grid, and every team or player, in
+one bincount over integer zone ids:
+
+    stats = zone_stats(x, y)                    # {'zones': 3x6, ...}
+    zone_profiles(passes, by='Team')            # {team: {grid: shares}}
+"""
+import numpy as np
+import pandas as pd
+
+# Final third line (Opta x)
+FINAL_THIRD = 2 / 3 * 100
+
+# (x edges, y edges) of every zone grid. y edges are measured from the
+# bottom touchline, like bin_statistic does on the (inverted) StatsBomb
+# pitch
+ZONE_GRIDS = {
+    # Six columns, split at the six yard box
+    'zones': (np.linspace(0, 120, num=7), np.array([0, 30, 50, 80])),
+    # Five columns
+    'vertical_zones': (np.linspace(0, 120, num=6), np.array([0, 80])),
+}
+
+
+def _bins(values, edges):
+    """Bin of every value (-1 outside the edges or NaN), last edge closed."""
+    bins = np.searchsorted(edges, values, side='right') - 1
+    bins[values == edges[-1]] = len(edges) - 2
+    bins[(bins < 0) | (bins >= len(edges) - 1) | np.isnan(values)] = -1
+    return bins
+
+
+def zone_stats(x, y, grids=None, key=None, n_keys=None, normalize=False):
+    """
+    Points (StatsBomb x, y) per zone of several grids of ZONE_GRIDS (all by
+    default) with a single bincount. Returns {grid: counts} with counts of
+    shape (y zones, x zones), top row first, as bin_statistic lays them out.
+
+    key (integer codes, -1 to leave a point out) splits the counts by team
+    or player: counts are then (n_keys, y zones, x zones). normalize=True
+    returns the share of each zone instead (per key).
+    """
+    grids = list(ZONE_GRIDS) if grids is None else list(grids)
+    keyed = key is not None
+    x = np.asarray(x, dtype=float)
+    # Bins are measured from the bottom touchline
+    y = 80 - np.asarray(y, dtype=float)
+    if not keyed:
+        key, n_keys = np.zeros(len(x), dtype=np.int64), 1
+    else:
+        key = np.asarray(key, dtype=np.int64)
+        if n_keys is None:
+            n_keys = int(key.max(initial=-1)) + 1
+
+    # Zone ids of all grids side by side: one block of zones per key
+    shapes, ids, offset = [], [], 0
+    for grid in grids:
+        bin_x, bin_y = ZONE_GRIDS[grid]
+        nx, ny = len(bin_x) - 1, len(bin_y) - 1
+        bx, by = _bins(x, bin_x), _bins(y, bin_y)
+        valid = (bx >= 0) & (by >= 0) & (key >= 0)
+        # Rows from the top of the pitch, like bin_statistic
+        zone = (ny - 1 - by) * nx + bx
+        ids.append(key[valid] * nx * ny + zone[valid] + offset * n_keys)
+        shapes.append((ny, nx))
+        offset += nx * ny
+
+    counts = np.bincount(np.concatenate(ids), minlength=offset * n_keys)
+
+    stats, start = {}, 0
+    for grid, (ny, nx) in zip(grids, shapes):
+        block = counts[start:start + n_keys * nx * ny].reshape(n_keys, ny, nx)
+        start += n_keys * nx * ny
+        if normalize:
+            with np.errstate(invalid='ignore'):
+                block = block / block.sum(axis=(1, 2), keepdims=True)
+        stats[grid] = block if keyed else block[0]
+    return stats
+
+
+def zone_counts(x, y, grid):
+    """Points per zone of ZONE_GRIDS[grid], see zone_stats."""
+    return zone_stats(x, y, [grid])[grid]
+
+
+def zone_profiles(df, by='Team', grids=None, normalize=True):
+    """
+    Zone stats of every value of column `by` (team or player) of an event
+    table with X_sb/Y_sb, from one zone_stats call:
+    {value: {grid: stats}}.
+    """
+    codes = pd.Categorical(df[by])
+    stats = zone_stats(df['X_sb'], df['Y_sb'], grids, key=codes.codes,
+                       n_keys=len(codes.categories), normalize=normalize)
+    return {value: {grid: s[i] for grid, s in stats.items()}
+            for i, value in enumerate(codes.categories)}
@@ -0,0 +1,33 @@
+"""
+Opta to StatsBomb coordinates: the same as mplsoccer's Standardizer,
+inside and outside the pitch and with missing values.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+from mplsoccer import Standardizer
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from footviz.events import to_statsbomb
+
+
+def test_to_statsbomb_matches_standardizer():
+    rng = np.random.default_rng(0)
+    x = np.concatenate([rng.uniform(-5, 105, 2000),
+                        [0, 5.8, 11.5, 17, 50, 83, 88.5, 94.2, 100]])
+    y = np.concatenate([rng.uniform(-5, 105, 2000),
+                        [0, 21.1, 36.8, 45.2, 54.8, 63.2, 78.9, 100, 50]])
+    expected_x, expected_y = Standardizer(
+        pitch_from='opta', pitch_to='statsbomb').transform(x, y)
+
+    x_sb, y_sb = to_statsbomb(x, y)
+    np.testing.assert_allclose(x_sb, expected_x, atol=1e-9)
+    np.testing.assert_allclose(y_sb, expected_y, atol=1e-9)
+
+
+def test_to_statsbomb_keeps_missing():
+    x_sb, y_sb = to_statsbomb([np.nan, 50, 100], [50, np.nan, 0])
+    np.testing.assert_array_equal(np.isnan(x_sb), [True, False, False])
+    np.testing.assert_array_equal(np.isnan(y_sb), [False, True, False])
+    assert (x_sb[2], y_sb[2]) == (120, 80)
@@ -0,0 +1,125 @@
+"""
+The incremental and indexed paths give the same results as computing
+from the whole table:
+
+    python -m pytest -q tests
+
+stream_aggregates vs load_events + match_aggregates, LiveNetwork vs
+build_network and RegionIndex.positions vs a full scan, on the real match
+logged out of order (late rows, stray receptions, other events, a second
+team).
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from footviz.events import load_events, team_rows
+from footviz.live import LiveNetwork, parse_line
+from footviz.network import build_network, sort_for_pairing
+from footviz.regions import (BOX, FINAL_THIRD_ZONE, OUTSIDE_FINAL_THIRD,
+                             ZONE_14, RegionIndex)
+from footviz.roster import Roster
+from footviz.season import match_aggregates
+from footviz.stream import stream_aggregates
+
+MATCH = Path(__file__).resolve().parents[1] / '20240124_LaConcordiaRed' \
+    / 'data' / '20240119_events.csv'
+
+ROSTER = {'1': '1 Albarracin', '54 Hurt': '54 Hurtado',
+          '2 Castro': '2 Castro', '3 Loor': '3 Loor', '52 Mndz': '52 Mendoza',
+          '19 Porozo': '19 Porozo', '15 Cmch': '15 Camacho',
+          '59 Vldz': '59 Valdez', '10 Cbzs': '10 Cabezas',
+          '7 Qntrs': '7 Quinteros', '11 Mlna': '11 Molina'}
+
+
+@pytest.fixture(scope='module')
+def messy(tmp_path_factory):
+    """The match as it could arrive from the logger."""
+    rng = np.random.default_rng(0)
+    df = pd.read_csv(MATCH, dtype=str)
+
+    away = df.sample(120, random_state=1).assign(
+        Team='Away', Player=lambda d: 'A' + d['Player'])
+    other = df.sample(30, random_state=2).assign(Event='Tackle')
+    stray = df[df['Event'] == 'Pass'].sample(10, random_state=3) \
+        .assign(Event='Pass Received', Secs='59')
+    df = pd.concat([df, away, other, stray], ignore_index=True)
+
+    # Shuffled, then some rows logged late, at the end of the file
+    df = df.iloc[rng.permutation(len(df))]
+    late = rng.random(len(df)) < 0.1
+    df = pd.concat([df[~late], df[late]])
+
+    path = tmp_path_factory.mktemp('events') / 'messy.csv'
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('chunksize', [1, 37, 1000, 100_000])
+@pytest.mark.parametrize('team', ['Home', None])
+def test_stream_aggregates(messy, chunksize, team):
+    df = team_rows(load_events(messy, use_cache=False), team)
+    expected = match_aggregates(df, 'm', ['3 Loor'])
+    agg = stream_aggregates(messy, 'm', team=team, players=['3 Loor'],
+                            chunksize=chunksize, pass_rows=True)
+
+    assert expected['misordered'] > 0
+    pd.testing.assert_frame_equal(agg['passes'], expected['passes'])
+    assert agg['misordered'] == expected['misordered']
+    assert agg['total_passes'] == expected['total_passes']
+    pd.testing.assert_frame_equal(agg['locations'], expected['locations'],
+                                  check_dtype=False)
+    for grid, counts in expected['zones'].items():
+        np.testing.assert_array_equal(agg['zones'][grid], counts)
+    pd.testing.assert_frame_equal(agg['final_third'],
+                                  expected['final_third'].sort_index())
+    pd.testing.assert_frame_equal(agg['events'], expected['events'])
+
+
+@pytest.mark.parametrize('team', ['Home', None])
+def test_live_network(messy, team):
+    live = LiveNetwork(ROSTER.values(), rename=ROSTER, team=team)
+    with open(messy, newline='') as f:
+        for line in f:
+            row = parse_line(line)
+            if row is not None:
+                live.add(row)
+    net = live.network()
+
+    df = team_rows(load_events(messy, use_cache=False), team)
+    expected = build_network(Roster(ROSTER).apply(sort_for_pairing(df)),
+                             live.players)
+
+    pd.testing.assert_frame_equal(net['passes'], expected['passes'])
+    assert net['misordered'] == expected['misordered']
+    assert net['max_val'] == expected['max_val']
+    assert net['total_passes'] == expected['total_passes']
+    pd.testing.assert_series_equal(net['totals'], expected['totals'])
+    pd.testing.assert_frame_equal(
+        net['locations'], expected['locations'].reindex(live.players),
+        check_dtype=False, check_names=False)
+
+
+@pytest.mark.parametrize('cells', [1, 3, 10, 17])
+def test_region_index(messy, cells):
+    df = load_events(messy, use_cache=False)
+    idx = RegionIndex(df, cells)
+    x, y, x2, y2 = (df[c].to_numpy(float) for c in ['X', 'Y', 'X2', 'Y2'])
+
+    regions = [None, OUTSIDE_FINAL_THIRD, FINAL_THIRD_ZONE, BOX, ZONE_14]
+    for events in ['Pass', 'Failed Pass', ['Pass', 'Failed Pass'], 'Nothing']:
+        event = df['Event'].isin([events] if isinstance(events, str)
+                                 else events).to_numpy()
+        for start in regions:
+            for end in regions:
+                keep = event.copy()
+                if start is not None:
+                    keep &= start.contains(x, y)
+                if end is not None:
+                    keep &= end.contains(x2, y2)
+                np.testing.assert_array_equal(
+                    idx.positions(events, start, end), np.flatnonzero(keep))
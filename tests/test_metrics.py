@@ -0,0 +1,95 @@
+"""
+Pass network metrics: betweenness against counting every shortest path
+by hand, and players without passes left out of everyone else's.
+"""
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from footviz.metrics import _betweenness, network_metrics
+
+
+def _paths(w, s, t):
+    """Every simple path from s to t, with its length (1 / passes)."""
+    stack = [(s, [s], 0.0)]
+    while stack:
+        u, path, length = stack.pop()
+        if u == t:
+            yield path, length
+            continue
+        for v in np.flatnonzero(w[u]):
+            if v not in path:
+                stack.append((v, path + [v], length + 1 / w[u, v]))
+
+
+def _brute_betweenness(w):
+    n = len(w)
+    between = np.zeros(n)
+    for s, t in itertools.combinations(range(n), 2):
+        paths = list(_paths(w, s, t))
+        if not paths:
+            continue
+        best = min(length for _, length in paths)
+        shortest = [p for p, length in paths
+                    if length <= best * (1 + 1e-9)]
+        for path in shortest:
+            for v in path[1:-1]:
+                between[v] += 1 / len(shortest)
+    return between / ((n - 1) * (n - 2) / 2) if n > 2 else between
+
+
+def _random_network(rng, n, density):
+    w = rng.integers(1, 4, (n, n)) * (rng.random((n, n)) < density)
+    w = np.triu(w, 1)
+    return (w + w.T).astype(float)
+
+
+@pytest.mark.parametrize('seed', range(12))
+def test_betweenness_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    # Small weights: plenty of ties; low densities: split networks
+    w = _random_network(rng, int(rng.integers(3, 8)),
+                        [0.3, 0.5, 0.8][seed % 3])
+    np.testing.assert_allclose(_betweenness(w), _brute_betweenness(w),
+                               atol=1e-12)
+
+
+def test_betweenness_by_hand():
+    # Star: every path between leaves goes through the centre
+    star = np.zeros((4, 4))
+    star[0, 1:] = star[1:, 0] = 1
+    np.testing.assert_allclose(_betweenness(star), [1, 0, 0, 0])
+    # Square with two equal routes from 0 to 2 and from 1 to 3
+    square = np.array([[0, 1, 0, 1], [1, 0, 1, 0],
+                       [0, 1, 0, 1], [1, 0, 1, 0]], dtype=float)
+    np.testing.assert_allclose(_betweenness(square), [1 / 6] * 4)
+    # Passes make links shorter: 0-2 goes through 1, not the direct link
+    w = np.array([[0, 4, 1], [4, 0, 4], [1, 4, 0]], dtype=float)
+    np.testing.assert_allclose(_betweenness(w), [0, 1, 0])
+
+
+def test_players_without_passes_left_out():
+    rng = np.random.default_rng(0)
+    w = _random_network(rng, 7, 0.6)
+    players = [f'{i} P' for i in range(7)]
+    metrics = network_metrics(pd.DataFrame(w, index=players,
+                                           columns=players))
+
+    # The same network with benched players (no passes) in between
+    padded = np.zeros((10, 10))
+    linked = [0, 2, 3, 5, 6, 8, 9]
+    padded[np.ix_(linked, linked)] = w
+    names = [f'{i} P' for i in range(10)]
+    with_bench = network_metrics(pd.DataFrame(padded, index=names,
+                                              columns=names))
+
+    pd.testing.assert_frame_equal(
+        with_bench.iloc[linked].reset_index(drop=True),
+        metrics.reset_index(drop=True))
+    # Eigenvector centrality only decays to 0 in the power iteration
+    np.testing.assert_allclose(with_bench.iloc[[1, 4, 7]], 0, atol=1e-12)
@@ -0,0 +1,46 @@
+"""
+Pass network figure: one heatmap panel per player of the list, whatever
+its length.
+"""
+import sys
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from footviz.events import load_events
+from footviz.network import build_network, sort_for_pairing
+from footviz.network_plot import build_pass_network
+
+MATCH = Path(__file__).resolve().parents[1] / '20240124_LaConcordiaRed' \
+    / 'data' / '20240119_events.csv'
+
+
+@pytest.fixture(scope='module')
+def match():
+    df = sort_for_pairing(load_events(MATCH, use_cache=False))
+    return df, build_network(df)
+
+
+@pytest.mark.parametrize('n', [5, 11, 14, 16])
+def test_heatmap_per_player(match, n):
+    df, net = match
+    players = df['Player'].value_counts().index[:n].tolist() + ['99 X']
+    fig, panels = build_pass_network(df, net, players)
+    heatmaps = [p for p in panels if p.func.__name__ == 'draw_player_heatmap']
+    titles = [p.ax.get_title() for p in heatmaps]
+    plt.close(fig)
+
+    assert len(heatmaps) == n + 1
+    assert titles[-1] == '99. X'
+    # The usual 3x3 + 2 grid up to 11 players, then rows of 3 more
+    grid = len(panels) - 1
+    if n + 1 <= 11:
+        assert grid == 11
+    else:
+        assert n + 1 <= grid < n + 4
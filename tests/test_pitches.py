@@ -0,0 +1,73 @@
+"""
+Cached pitch markings: one cache entry per set of pitch arguments, and
+drawn the same as pitch.draw.
+"""
+import io
+import sys
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from mplsoccer import Pitch, VerticalPitch
+from PIL import Image
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from footviz import pitches
+
+PITCHES = [
+    (Pitch, {}),
+    (Pitch, {'pitch_type': 'opta'}),
+    (Pitch, {'linestyle': '--'}),
+    (Pitch, {'positional': True, 'positional_color': 'red'}),
+    (Pitch, {'goal_type': 'box', 'corner_arcs': True}),
+    (Pitch, {'shade_middle': True}),
+    (Pitch, {'spot_type': 'square'}),
+    (VerticalPitch, {'pitch_type': 'opta', 'half': True,
+                     'goal_type': 'line', 'goal_linestyle': '--'}),
+    (VerticalPitch, {'pitch_color': '#22312b', 'line_alpha': 0.5}),
+]
+
+
+def _render(pitch, draw):
+    fig, ax = plt.subplots(figsize=(6, 4))
+    draw(pitch, ax)
+    buf = io.BytesIO()
+    fig.savefig(buf, dpi=80)
+    plt.close(fig)
+    return np.asarray(Image.open(buf).convert('RGB'))
+
+
+def _draw(pitch, ax):
+    pitch.draw(ax=ax)
+    pitches._hide_axis(pitch, ax)
+
+
+def test_key_covers_every_argument():
+    red = Pitch(positional=True, positional_color='red')
+    blue = Pitch(positional=True, positional_color='blue')
+    assert pitches.pitch_key(red) != pitches.pitch_key(blue)
+    assert pitches.pitch_key(red) == pitches.pitch_key(
+        Pitch(positional=True, positional_color='red'))
+    assert pitches.pitch_key(Pitch(spot_type='square')) \
+        != pitches.pitch_key(Pitch())
+
+
+@pytest.mark.parametrize('cls, kwargs', PITCHES)
+def test_cached_draw_matches_pitch_draw(tmp_path, cls, kwargs):
+    pitch = cls(**kwargs)
+    expected = _render(pitch, _draw)
+
+    def cached(pitch, ax):
+        pitches.draw_pitch(pitch, ax, cache_dir=tmp_path)
+
+    pitches._memory.clear()
+    captured = _render(pitch, cached)
+    pitches._memory.clear()
+    from_disk = _render(pitch, cached)
+    np.testing.assert_array_equal(captured, expected)
+    np.testing.assert_array_equal(from_disk, expected)
@@ -0,0 +1,95 @@
+"""
+Stored match aggregates: reused without hashing unchanged files, and
+recomputed only when the file or the options change.
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from footviz import season
+
+MATCH = Path(__file__).resolve().parents[1] / '20240124_LaConcordiaRed' \
+    / 'data' / '20240119_events.csv'
+
+
+@pytest.fixture
+def match(tmp_path):
+    path = tmp_path / 'events' / 'm1.csv'
+    path.parent.mkdir()
+    shutil.copy(MATCH, path)
+    return path
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    """Paths hashed by footviz.season."""
+    hashed = []
+
+    def file_hash(path):
+        hashed.append(Path(path))
+        return season_file_hash(path)
+
+    season_file_hash = season.file_hash
+    monkeypatch.setattr(season, 'file_hash', file_hash)
+    return hashed
+
+
+def _update(match, out, **options):
+    return season.update_season([match], out, team='Home',
+                                players=['3 Loor'], workers=1, **options)
+
+
+def test_unchanged_file_not_hashed(match, tmp_path, hashes, capsys):
+    out = tmp_path / 'out'
+    first, = _update(match, out)
+    assert hashes == [match]
+
+    hashes.clear()
+    again, = _update(match, out)
+    assert hashes == []
+    assert 'up to date' in capsys.readouterr().out
+    assert again['passes'].equals(first['passes'])
+
+    # Touched: hashed once, then known again
+    os.utime(match, ns=(0, 0))
+    _update(match, out)
+    _update(match, out)
+    assert hashes == [match]
+    assert 'computed' not in capsys.readouterr().out
+
+
+def test_changed_file_or_options_recomputed(match, tmp_path, capsys):
+    out = tmp_path / 'out'
+    _update(match, out)
+    capsys.readouterr()
+
+    text = match.read_text().rstrip('\n')
+    match.write_text(text + '\nHome,3 Loor,Shot,80,0,90,50,100,50\n')
+    agg, = _update(match, out)
+    assert 'm1: computed' in capsys.readouterr().out
+    assert agg['events']['Event'].eq('Shot').sum() == 27
+
+    _update(match, out, half_time=45)
+    assert 'm1: computed' in capsys.readouterr().out
+
+
+def test_pass_rows_reused_without(match, tmp_path, capsys):
+    out = tmp_path / 'out'
+    full, = _update(match, out, pass_rows=True)
+    capsys.readouterr()
+
+    # Streaming without the figure: the stored rows are more than enough
+    agg, = _update(match, out, stream=True, pass_rows=False)
+    assert 'up to date' in capsys.readouterr().out
+    assert agg['events'].equals(full['events'])
+
+    # The other way around the pass rows are missing
+    shutil.rmtree(out)
+    _update(match, out, stream=True, pass_rows=False)
+    capsys.readouterr()
+    _update(match, out, stream=True, pass_rows=True)
+    assert 'm1: computed (streamed)' in capsys.readouterr().out
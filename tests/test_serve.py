@@ -0,0 +1,96 @@
+"""
+Render server requests: bad input is answered with 400, not a crash, and
+only files under the data root are read.
+"""
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from footviz import synthetic
+from footviz.serve import RenderHandler, _warm
+
+HEADER = 'Team,Player,Event,Mins,Secs,X,Y,X2,Y2\n'
+ROWS = ['Home,1 A,Pass,1,0,40,50,60,50',
+        'Home,2 B,Pass Received,1,0,60,50,-,-',
+        'Home,2 B,Shot,1,5,90,50,100,50']
+EVENTS = HEADER + '\n'.join(ROWS) + '\n'
+PLAYERS = {'1 A': '1 A', '2 B': '2 B'}
+
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    base = tmp_path_factory.mktemp('serve')
+    root = base / 'data'
+    root.mkdir()
+    (root / 'match.csv').write_text(EVENTS)
+    (base / 'outside.csv').write_text(EVENTS)
+    (root / 'link.csv').symlink_to(base / 'outside.csv')
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        RenderHandler.pool = pool
+        RenderHandler.data_root = root
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), RenderHandler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        yield f'http://127.0.0.1:{httpd.server_port}/render'
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _post(url, request):
+    data = request if isinstance(request, bytes) \
+        else json.dumps(request).encode()
+    try:
+        with urllib.request.urlopen(url, data) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+@pytest.mark.parametrize('request_', [
+    b'{not json',
+    [1, 2],
+    {'report': 'heatmap', 'events_csv': HEADER},
+    {'report': 'shotmap'},
+    {'report': 'shotmap', 'events_csv': 'Team,Player,Event\nHome,a,Pass\n'},
+    {'report': 'shotmap', 'events_csv': HEADER + 'Home,a,Pass,x,1,2,3,4,5\n'},
+    {'report': 'shotmap', 'events_csv': ''},
+    {'report': 'shotmap', 'events': 'no_such_file.csv'},
+    {'report': 'pass_network', 'events_csv': HEADER},
+    # Outside the data root
+    {'report': 'shotmap', 'events': '../outside.csv'},
+    {'report': 'shotmap', 'events': '/etc/passwd'},
+    {'report': 'shotmap', 'events': 'link.csv'},
+    {'report': 'shotmap', 'events': 'match.csv', 'logo': '../outside.csv'},
+    {'report': 'shotmap', 'events': ['match.csv']},
+])
+def test_bad_requests(server, request_):
+    status, body = _post(server, request_)
+    assert status == 400, body
+
+
+@pytest.mark.parametrize('events', [{'events_csv': EVENTS},
+                                    {'events': 'match.csv'},
+                                    {'events': 'sub/../match.csv'}])
+def test_render(server, events):
+    status, body = _post(server, {'report': 'pass_network', **events,
+                                  'players': PLAYERS,
+                                  'preview': True, 'dpi': 20})
+    assert status == 200, body
+    assert body.startswith(b'\x89PNG')
+
+
+def test_warm_without_sample_files(monkeypatch, tmp_path):
+    monkeypatch.setattr(synthetic, 'TEMPLATE', tmp_path / 'missing.csv')
+    _warm()
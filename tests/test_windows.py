@@ -0,0 +1,72 @@
+"""
+Windowed pass networks: the same as build_network on the rows of the
+window, and a pass that crosses into the next minute counted once.
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from footviz.events import load_events
+from footviz.network import build_network, player_index, sort_for_pairing
+from footviz.windows import NetworkTimeline
+
+MATCH = Path(__file__).resolve().parents[1] / '20240124_LaConcordiaRed' \
+    / 'data' / '20240119_events.csv'
+
+WINDOWS = [(0, 30), (30, 60), (60, 200), (0, 114), (45, 46), (10, 10),
+           (50, 40), (-5, 3), (113, 114)]
+
+
+@pytest.fixture(scope='module')
+def match():
+    df = sort_for_pairing(load_events(MATCH, use_cache=False))
+    return df, player_index(df)
+
+
+def _assert_network(net, expected):
+    pd.testing.assert_frame_equal(net['passes'], expected['passes'],
+                                  check_dtype=False, check_names=False)
+    pd.testing.assert_series_equal(net['totals'], expected['totals'],
+                                   check_dtype=False, check_names=False)
+    for key in ['misordered', 'max_val', 'total_passes']:
+        assert net[key] == expected[key], key
+    pd.testing.assert_frame_equal(
+        net['locations'], expected['locations'], check_dtype=False,
+        check_names=False, check_index_type=False)
+
+
+def test_windows_match_build_network(match):
+    df, players = match
+    timeline = NetworkTimeline(df, players)
+    nets = timeline.networks(WINDOWS)
+    assert len(nets) == len(WINDOWS)
+    for (start, end), net in zip(WINDOWS, nets):
+        rows = df[(df['Mins'] >= start) & (df['Mins'] < end)]
+        pd.testing.assert_frame_equal(timeline.rows(start, end), rows)
+        _assert_network(net, build_network(rows, players))
+
+    # The whole match, the default window
+    _assert_network(timeline.network(), build_network(df, players))
+    assert len(timeline.rows()) == len(df)
+
+
+def test_pass_counted_in_the_minute_received(tmp_path):
+    path = tmp_path / 'events.csv'
+    path.write_text('Team,Player,Event,Mins,Secs,X,Y,X2,Y2\n'
+                    'Home,1 A,Pass,29,59,40,50,60,50\n'
+                    'Home,2 B,Pass Received,30,0,60,50,-,-\n'
+                    'Home,2 B,Pass,30,5,60,50,70,40\n'
+                    'Home,1 A,Pass Received,30,6,70,40,-,-\n')
+    df = sort_for_pairing(load_events(path, use_cache=False))
+    timeline = NetworkTimeline(df)
+
+    first, second = timeline.networks([(0, 30), (30, 31)])
+    assert first['passes'].to_numpy().sum() == 0
+    assert second['passes'].loc['1 A', '2 B'] == 2
+    # The pass itself is the first window's, not a stray reception
+    assert (first['total_passes'], second['total_passes']) == (1, 1)
+    assert first['misordered'] == second['misordered'] == 0
+    _assert_network(timeline.network(0, 31), build_network(df))
@@ -0,0 +1,62 @@
+"""
+Zone counts: the same as mplsoccer's bin_statistic for every grid, and
+split by key the same as counting each key on its own.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from mplsoccer import Pitch
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from footviz.zones import ZONE_GRIDS, zone_profiles, zone_stats
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-5, 125, 3000)
+    y = rng.uniform(-5, 85, 3000)
+    # Edges, corners and missing values
+    x[:6] = [0, 120, 20, 60, np.nan, 120]
+    y[:6] = [0, 80, 30, 50, 40, np.nan]
+    key = rng.integers(-1, 4, len(x))
+    return x, y, key
+
+
+@pytest.mark.parametrize('grid', list(ZONE_GRIDS))
+def test_zone_stats_matches_bin_statistic(points, grid):
+    x, y, _ = points
+    expected = Pitch(pitch_type='statsbomb').bin_statistic(
+        x, y, statistic='count', bins=ZONE_GRIDS[grid])['statistic']
+    np.testing.assert_array_equal(zone_stats(x, y)[grid], expected)
+
+
+def test_zone_stats_by_key(points):
+    x, y, key = points
+    stats = zone_stats(x, y, key=key, n_keys=5)
+    shares = zone_stats(x, y, key=key, n_keys=5, normalize=True)
+    for grid in ZONE_GRIDS:
+        assert stats[grid].shape[0] == 5
+        for k in range(5):
+            counts = zone_stats(x[key == k], y[key == k])[grid]
+            np.testing.assert_array_equal(stats[grid][k], counts)
+            if counts.sum():
+                np.testing.assert_allclose(shares[grid][k],
+                                           counts / counts.sum())
+            else:
+                assert np.isnan(shares[grid][k]).all()
+
+
+def test_zone_profiles(points):
+    x, y, key = points
+    df = pd.DataFrame({'X_sb': x, 'Y_sb': y,
+                       'Team': np.where(key % 2 == 0, 'Home', 'Away')})
+    profiles = zone_profiles(df, by='Team', normalize=False)
+    assert sorted(profiles) == ['Away', 'Home']
+    for team, stats in profiles.items():
+        rows = df[df['Team'] == team]
+        for grid, counts in zone_stats(rows['X_sb'], rows['Y_sb']).items():
+            np.testing.assert_array_equal(stats[grid], counts)